@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 from pathlib import Path
 from typing import Optional
@@ -18,16 +20,32 @@ class Settings(BaseSettings):
     qdrant_host: str = "localhost"
     qdrant_port: int = 6333
     qdrant_collection_name: str = "image_descriptions"
+    qdrant_grpc_port: int = 6334
+    qdrant_prefer_grpc: bool = True
+    qdrant_pool_size: int = 32
+    qdrant_timeout: int = 60
     
     # Application Configuration
     app_host: str = "0.0.0.0"
     app_port: int = 8000
     debug: bool = False
+    cors_origins: list[str] = []  # Explicit origins only; "*" is rejected at startup
     
     # Data paths
     data_dir: Path = Path("./data")
     images_dir: Path = Path("./data/images")
     outputs_dir: Path = Path("./data/outputs")
+    
+    # Embedding cache
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: Path = Path("./data/embedding_cache.sqlite3")
+    
+    # Qdrant search result cache (0 disables it)
+    retrieval_cache_ttl: int = 86400
+    retrieval_cache_path: Path = Path("./data/retrieval_cache.sqlite3")
+    
+    # Seconds a downloaded S3 image is reused before it is fetched again (0 disables it)
+    image_cache_ttl: int = 300
 
     # Langsmith tracing
     langsmith_tracing: Optional[bool] = True
@@ -50,4 +68,22 @@ class Settings(BaseSettings):
         self.outputs_dir.mkdir(parents=True, exist_ok=True)
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the application settings once and return the cached instance."""
+    return Settings()
+
+
+class _LazySettings:
+    """Proxy for the legacy ``settings`` symbol that defers the .env parse to first use."""
+    
+    __slots__ = ()
+    
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+    
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+
+settings = _LazySettings()
@@ -1,6 +1,21 @@
-import json
+"""
+Reduce a raw PSS (Parts and Service Standards) export to the fields the
+estimate pipeline uses.
 
-AVAILABLE_OPERATIONS = {
+The projection stays in Python rather than a jq/JMESPath expression: the
+R&I filter needs a case-insensitive regex, operation ids are mapped through
+AVAILABLE_OPERATIONS, and empty levels are pruned bottom-up, none of which
+JMESPath can express, and pyjq is not a maintained dependency.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+
+import ijson
+import orjson
+
+AVAILABLE_OPERATIONS = MappingProxyType({
   1:"Remove/Replace",
   2: "Remove/Install",
   3:"Additional Labor",
@@ -12,7 +27,17 @@ AVAILABLE_OPERATIONS = {
   9:"Repair",
   10:"Blend",
   16:"Paintless Repair"
-}
+})
+
+# Operation ids are small dense ints, so index a tuple instead of hashing
+_OPERATION_NAMES = tuple(AVAILABLE_OPERATIONS.get(i) for i in range(max(AVAILABLE_OPERATIONS) + 1))
+
+# Matches R&I (Remove & Install) parts without lowercasing the description
+R_AND_I_PATTERN = re.compile(r"r&i", re.IGNORECASE)
+
+# Below this many categories the process pool start-up and pickling cost
+# outweighs the parallel speedup
+PARALLEL_CATEGORY_THRESHOLD = 64
 
 
 def extract_images(images_data):
@@ -22,117 +47,190 @@ def extract_images(images_data):
     if not images_data:
         return []
     
-    optimized_images = []
+    # Images may be a single object or a list of them
+    image_objs = images_data if isinstance(images_data, list) else [images_data]
     
-    if isinstance(images_data, list):
-        for image_obj in images_data:
-            optimized_image = {
-                "Location": image_obj.get("Location"),
-                "Callouts": []
-            }
-            
-            callouts = image_obj.get("Callouts", [])
-            for callout in callouts:
-                optimized_callout = {
+    return [
+        {
+            "Location": image_obj.get("Location"),
+            "Callouts": [
+                {
                     "CalloutNumber": callout.get("CalloutNumber"),
                     "PartId": callout.get("PartId")
                 }
-                optimized_image["Callouts"].append(optimized_callout)
-            
-            optimized_images.append(optimized_image)
-    
-    elif isinstance(images_data, dict):
-        optimized_image = {
-            "Location": images_data.get("Location"),
-            "Callouts": []
+                for callout in image_obj.get("Callouts", ())
+            ]
         }
+        for image_obj in image_objs
+    ]
+
+
+def _build_part_details(part_details):
+    """
+    Yield the optimized form of each PartDetails entry.
+    """
+    operation_names = _OPERATION_NAMES
+    operation_count = len(operation_names)
+    for detail in part_details:
+        detail_get = detail.get
+        part_obj = detail_get("Part", {})
+        current_price = part_obj.get("Price", {}).get("CurrentPrice", 0)
         
-        callouts = images_data.get("Callouts", [])
-        for callout in callouts:
-            optimized_callout = {
-                "CalloutNumber": callout.get("CalloutNumber"),
-                "PartId": callout.get("PartId")
-            }
-            optimized_image["Callouts"].append(optimized_callout)
-        
-        optimized_images.append(optimized_image)
+        # Only include expensive parts (>$100)
+        # if current_price > 100:
+        yield {
+            "Id": detail_get("Id"),
+            "FullDescription": detail_get("FullDescription"),
+            "Part": {
+                "Description": part_obj.get("Description"),
+                "Price": {"CurrentPrice": current_price}
+            },
+            "AvailableOperations": [
+                operation_name
+                for operation in detail_get("LaborOperations", ())
+                if type(operation_id := operation.get("LaborOperationId")) is int
+                and 0 <= operation_id < operation_count
+                and (operation_name := operation_names[operation_id]) is not None
+            ]
+        }
+
+
+def _build_part(part):
+    """
+    Optimize a single part, or return None if it should be dropped.
+    """
+    part_get = part.get
+    # Skip R&I and Refinish parts
+    if R_AND_I_PATTERN.search(part_get("Description") or ""):
+        return None
     
-    return optimized_images 
+    optimized_details = list(_build_part_details(part_get("PartDetails", ())))
+    if not optimized_details:
+        return None
+    
+    return {
+        "Id": part_get("Id"),
+        "Description": part_get("Description"),
+        "PartDetails": optimized_details
+    }
 
 
-def extract_required_pss_data(full_pss_data):
+def _build_subcategory(subcategory):
+    """
+    Optimize a single subcategory, or return None if no part survives.
+    """
+    subcategory_get = subcategory.get
+    optimized_parts = [
+        part for part in map(_build_part, subcategory_get("Parts", ())) if part is not None
+    ]
+    if not optimized_parts:
+        return None
+    
+    return {
+        "Id": subcategory_get("Id"),
+        "Description": subcategory_get("Description"),
+        "Parts": optimized_parts,
+        "Images": extract_images(subcategory_get("Images", []))
+    }
+
+
+def optimize_category(category):
+    """
+    Extract only required fields from a single PSS category.
+    Returns None when no subcategory survives the filtering.
+    """
+    category_get = category.get
+    optimized_subcategories = [
+        subcategory
+        for subcategory in map(_build_subcategory, category_get("SubCategories", ()))
+        if subcategory is not None
+    ]
+    if not optimized_subcategories:
+        return None
+    
+    return {
+        "Id": category_get("Id"),
+        "Description": category_get("Description"),
+        "SubCategories": optimized_subcategories
+    }
+
+
+def iter_optimized_categories(categories):
+    """
+    Lazily optimize an iterable of PSS categories, skipping empty ones.
+    """
+    for category in categories:
+        optimized_category = optimize_category(category)
+        if optimized_category is not None:
+            yield optimized_category
+
+
+def extract_required_pss_data(full_pss_data, max_workers=None):
     """
     Extract only required fields from PSS data
+    
+    Large documents are optimized across a process pool, one category per
+    task; pass max_workers=1 to force the single-process path.
     """
-    optimized_pss = {"Categories": [] ,'SuperCategories':full_pss_data.get('SuperCategories',[])}
     categories = full_pss_data.get("Categories", [])
-    for category in categories:
-        optimized_category = {
-            "Id": category.get("Id"),
-            "Description": category.get("Description"),
-            "SubCategories": []
-        }
-        
-        subcategories = category.get("SubCategories", [])
-        for subcategory in subcategories:
-            optimized_subcategory = {
-                "Id": subcategory.get("Id"),
-                "Description": subcategory.get("Description"),
-                "Parts": [],
-                "Images": extract_images(subcategory.get("Images", []))
-            }
-            
-            parts = subcategory.get("Parts", [])
-            for part in parts:
-                # Skip R&I and Refinish parts
-                part_description = part.get("Description", "").lower()
-                if "r&i" in part_description:
-                    continue
-                
-                optimized_part = {
-                    "Id": part.get("Id"),
-                    "Description": part.get("Description"),
-                    "PartDetails": []
-                }
-                
-                part_details = part.get("PartDetails", [])
-                for detail in part_details:
-                    part_obj = detail.get("Part", {})
-                    price_obj = part_obj.get("Price", {})
-                    current_price = price_obj.get("CurrentPrice", 0)
-                    
-                    # Only include expensive parts (>$100)
-                    # if current_price > 100:
-                    optimized_detail = {
-                        "Id": detail.get("Id"),
-                        "FullDescription": detail.get("FullDescription"),
-                        "Part": {
-                            "Description": part_obj.get("Description"),
-                            "Price": {"CurrentPrice": current_price}
-                        },
-                        "AvailableOperations":[]
-                    }
-                    for operation in detail.get("LaborOperations",[]):
-                        print(operation.get("LaborOperationId",""),"LaborOperationId")
-                        if AVAILABLE_OPERATIONS.get(operation.get("LaborOperationId","")):
-                            optimized_detail["AvailableOperations"].append(AVAILABLE_OPERATIONS.get(operation.get("LaborOperationId")))
-                    optimized_part["PartDetails"].append(optimized_detail)
-                
-                if optimized_part["PartDetails"]:
-                    optimized_subcategory["Parts"].append(optimized_part)
-            
-            if optimized_subcategory["Parts"]:
-                optimized_category["SubCategories"].append(optimized_subcategory)
-        
-        if optimized_category["SubCategories"]:
-            optimized_pss["Categories"].append(optimized_category)
+    if max_workers != 1 and len(categories) >= PARALLEL_CATEGORY_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            optimized_categories = [
+                category
+                for category in pool.map(optimize_category, categories, chunksize=8)
+                if category is not None
+            ]
+    else:
+        optimized_categories = list(iter_optimized_categories(categories))
     
-    return optimized_pss
+    return {
+        "Categories": optimized_categories,
+        "SuperCategories": full_pss_data.get("SuperCategories", []),
+    }
 
 
+def write_optimized_pss(super_categories, categories, out):
+    """
+    Optimize categories and serialize them to a binary file object as they
+    are produced, so the full optimized tree is never held in memory.
+    """
+    out.write(b'{"SuperCategories":')
+    out.write(orjson.dumps(super_categories))
+    out.write(b',"Categories":[')
+    for i, optimized_category in enumerate(iter_optimized_categories(categories)):
+        if i:
+            out.write(b",")
+        out.write(orjson.dumps(optimized_category))
+    out.write(b"]}")
+
+
+def dump_required_pss_data(full_pss_data, out):
+    """
+    Streaming counterpart of extract_required_pss_data for an already loaded
+    PSS dict: writes the optimized JSON to out instead of returning it.
+    """
+    write_optimized_pss(
+        full_pss_data.get("SuperCategories", []),
+        full_pss_data.get("Categories", []),
+        out,
+    )
+
+
+def stream_optimize_pss_file(input_path, output_path):
+    """
+    Optimize a PSS JSON file without loading the whole document.
+    
+    Categories are parsed incrementally with ijson, optimized one at a
+    time and written straight to the output file, so peak memory is
+    bounded by the largest single category instead of the full file.
+    """
+    with open(input_path, "rb") as f:
+        super_categories = next(ijson.items(f, "SuperCategories", use_float=True), [])
+        f.seek(0)
+        
+        with open(output_path, "wb") as out:
+            write_optimized_pss(super_categories, ijson.items(f, "Categories.item", use_float=True), out)
 
-with open("pss_subaru_copy.json", "r") as f:
-    full_pss_data = json.load(f)
 
-with open("optimized_pss.json", "w") as f:
-    json.dump(extract_required_pss_data(full_pss_data), f, indent=4)
+if __name__ == "__main__":
+    stream_optimize_pss_file("pss_subaru_copy.json", "optimized_pss.json")
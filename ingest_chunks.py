@@ -0,0 +1,92 @@
+"""Script to backfill the Qdrant collection from saved damage chunk JSON files.
+
+Each file holds one ChunkOutput (as returned by the analyze endpoints) or a
+list of them; directories are searched for *.json files. Chunks already in
+the collection are skipped, so re-running the backfill is safe.
+
+Usage:
+    python ingest_chunks.py samples/
+    python ingest_chunks.py chunks/ --collection damage_chunks_backfill --parallel 8
+"""
+
+import argparse
+import orjson
+from pathlib import Path
+from models.vehicle_damage import ChunkOutput
+from services.qdrant_service import QdrantService
+
+
+def load_chunks(paths: list[str]) -> list[ChunkOutput]:
+    """
+    Load and validate the ChunkOutputs stored in the given files and directories.
+    
+    Args:
+        paths: JSON files, or directories whose *.json files are read
+    
+    Returns:
+        The validated chunks, in file order
+    """
+    files: list[Path] = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.json")) if path.is_dir() else [path])
+    
+    chunks: list[ChunkOutput] = []
+    for file in files:
+        data = orjson.loads(file.read_bytes())
+        for item in data if isinstance(data, list) else [data]:
+            chunks.append(ChunkOutput.model_validate(item))
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk upload damage chunk JSON files to Qdrant"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="Chunk JSON files or directories containing them"
+    )
+    parser.add_argument(
+        "--collection",
+        default=None,
+        help="Target collection (defaults to QDRANT_COLLECTION_NAME)"
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=QdrantService.BULK_UPLOAD_PARALLEL,
+        help="Number of parallel upload workers"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=QdrantService.BULK_UPLOAD_BATCH_SIZE,
+        help="Points sent per upload request"
+    )
+    
+    args = parser.parse_args()
+    
+    chunks = load_chunks(args.paths)
+    if not chunks:
+        print("✗ No chunks found")
+        return
+    
+    service = QdrantService(collection_name=args.collection)
+    try:
+        point_ids, written = service.bulk_upload_damage_chunks(
+            chunks,
+            parallel=args.parallel,
+            batch_size=args.batch_size,
+        )
+    finally:
+        service.close()
+    
+    print(f"✓ Ingested {written} chunks into {service.collection_name}")
+    skipped = len(set(point_ids)) - written
+    if skipped:
+        print(f"  Skipped {skipped} chunks already stored")
+
+
+if __name__ == "__main__":
+    main()
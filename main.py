@@ -1,10 +1,123 @@
 """FastAPI application for image preprocessing using Gemini 3 API."""
 
+import asyncio
+import logging
+import sys
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from config import settings
+from config import get_settings
+from middleware.auth import _fernet
 from routes import qdrant_router, health_router, vehicle_damage_router, rag_router
+from services import QdrantService, VehicleDamageService, RAGService
+
+
+def _start_log_listener(debug: bool) -> QueueListener:
+    """
+    Route application logging through a queue.
+    
+    Request handlers only enqueue records; a background listener thread does
+    the formatting and stderr writes, keeping that I/O off the event loop.
+    """
+    queue = SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(queue))
+    root.setLevel(logging.DEBUG if debug else logging.INFO)
+    
+    listener = QueueListener(queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def _stop_log_listener(listener: QueueListener) -> None:
+    """Flush queued records and detach the queue handler from the root logger."""
+    listener.stop()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
+
+
+class _OrjsonResponse(JSONResponse):
+    """JSONResponse rendered by orjson; FastAPI's own ORJSONResponse is deprecated."""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+# Seconds between background Qdrant connectivity checks for /health
+QDRANT_HEALTH_INTERVAL = 5.0
+
+
+async def _monitor_qdrant(app: FastAPI, collection_name: str) -> None:
+    """Refresh app.state.qdrant_connected so /health never blocks on Qdrant."""
+    while True:
+        service = app.state.qdrant_services.get(collection_name)
+        connected = False
+        if service is not None:
+            connected = await asyncio.to_thread(service.is_connected)
+        app.state.qdrant_connected = connected
+        await asyncio.sleep(QDRANT_HEALTH_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize application on startup."""
+    settings = get_settings()
+    log_listener = _start_log_listener(settings.debug)
+    
+    # Ensure data directories exist
+    settings.ensure_directories()
+    
+    # Log configuration status
+    gemini_configured = bool(settings.gemini_api_key)
+    aws_configured = bool(settings.aws_access_key_id and settings.aws_secret_access_key)
+    
+    sys.stdout.write("".join([
+        "✓ Gemini API key configured\n" if gemini_configured else "✗ Warning: GEMINI_API_KEY not set\n",
+        "✓ AWS S3 credentials configured\n" if aws_configured else "✗ Warning: AWS S3 credentials not set\n",
+        f"✓ Data directory: {settings.data_dir}\n",
+        f"✓ Images directory: {settings.images_dir}\n",
+        f"✓ Outputs directory: {settings.outputs_dir}\n",
+        f"✓ Qdrant: {settings.qdrant_host}:{settings.qdrant_port}\n",
+    ]))
+    sys.stdout.flush()
+    
+    # Warm the API key decryption cache so the first request doesn't pay for it
+    if settings.encryption_key:
+        _fernet()
+    
+    # Long-lived services shared by every request; the route dependencies
+    # create them lazily instead if they could not be built here
+    app.state.qdrant_services = {}
+    if gemini_configured:
+        app.state.qdrant_services[settings.qdrant_collection_name] = QdrantService()
+        app.state.vehicle_damage_service = VehicleDamageService()
+        app.state.rag_service = RAGService()
+    
+    app.state.qdrant_connected = False
+    qdrant_monitor = asyncio.create_task(_monitor_qdrant(app, settings.qdrant_collection_name))
+    
+    try:
+        yield
+    finally:
+        qdrant_monitor.cancel()
+        for qdrant_service in app.state.qdrant_services.values():
+            qdrant_service.close()
+        rag_service = getattr(app.state, "rag_service", None)
+        if rag_service is not None:
+            rag_service.close()
+        _stop_log_listener(log_listener)
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -13,15 +126,25 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    # Dict responses (search results, collection info, status payloads) are
+    # encoded by orjson instead of the stdlib json module
+    default_response_class=_OrjsonResponse,
 )
 
 # Add CORS middleware
+# Explicit origins/methods/headers let Starlette precompute the CORS response
+# headers once instead of echoing request values on every call.
+cors_origins = get_settings().cors_origins
+if "*" in cors_origins:
+    # With credentials allowed, a wildcard makes Starlette echo every Origin
+    raise RuntimeError("CORS_ORIGINS must list explicit origins; '*' cannot be combined with credentials")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "x-api-key"],
 )
 
 # Include routers
@@ -31,32 +154,10 @@ app.include_router(vehicle_damage_router)
 app.include_router(rag_router)
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize application on startup."""
-    # Ensure data directories exist
-    settings.ensure_directories()
-    
-    # Log configuration status
-    if settings.gemini_api_key:
-        print("✓ Gemini API key configured")
-    else:
-        print("✗ Warning: GEMINI_API_KEY not set")
-    
-    if settings.aws_access_key_id and settings.aws_secret_access_key:
-        print("✓ AWS S3 credentials configured")
-    else:
-        print("✗ Warning: AWS S3 credentials not set")
-    
-    print(f"✓ Data directory: {settings.data_dir}")
-    print(f"✓ Images directory: {settings.images_dir}")
-    print(f"✓ Outputs directory: {settings.outputs_dir}")
-    print(f"✓ Qdrant: {settings.qdrant_host}:{settings.qdrant_port}")
-
-
 if __name__ == "__main__":
     import uvicorn
     
+    settings = get_settings()
     uvicorn.run(
         "main:app",
         host=settings.app_host,
@@ -4,8 +4,10 @@ from fastapi import HTTPException, Header, Depends
 from cryptography.fernet import Fernet, InvalidToken
 import base64
 import hashlib
+import hmac
+from functools import lru_cache
 
-from config import settings
+from config import get_settings
 
 
 def _get_fernet_key(encryption_key: str) -> bytes:
@@ -19,6 +21,15 @@ def _get_fernet_key(encryption_key: str) -> bytes:
     return base64.urlsafe_b64encode(key_hash)
 
 
+@lru_cache(maxsize=1)
+def _fernet() -> Fernet:
+    """
+    Build the Fernet instance for the configured encryption key once.
+    The key is constant for the lifetime of the process.
+    """
+    return Fernet(_get_fernet_key(get_settings().encryption_key))
+
+
 def decrypt_api_key(encrypted_value: str) -> str:
     """
     Decrypt the encrypted API key using the encryption key from settings.
@@ -32,6 +43,7 @@ def decrypt_api_key(encrypted_value: str) -> str:
     Raises:
         HTTPException: If decryption fails
     """
+    settings = get_settings()
     if not settings.encryption_key:
         raise HTTPException(
             status_code=500,
@@ -39,9 +51,7 @@ def decrypt_api_key(encrypted_value: str) -> str:
         )
     
     try:
-        fernet_key = _get_fernet_key(settings.encryption_key)
-        fernet = Fernet(fernet_key)
-        decrypted = fernet.decrypt(encrypted_value.encode())
+        decrypted = _fernet().decrypt(encrypted_value.encode())
         return decrypted.decode()
     except InvalidToken:
         raise HTTPException(
@@ -55,6 +65,19 @@ def decrypt_api_key(encrypted_value: str) -> str:
         )
 
 
+@lru_cache(maxsize=1024)
+def _is_valid_api_key(x_api_key: str, expected_api_key: str) -> bool:
+    """
+    Decrypt the incoming API key and compare it with the expected one.
+    
+    Results are memoized per (header, expected key) pair so repeat clients skip
+    the decryption. Including the expected key means a rotated API_KEY never
+    reuses stale results. Decryption failures raise and are not cached.
+    """
+    decrypted_key = decrypt_api_key(x_api_key)
+    return hmac.compare_digest(decrypted_key.encode(), expected_api_key.encode())
+
+
 def get_api_key_header(x_api_key: str = Header(..., alias="x-api-key")) -> str:
     """
     FastAPI dependency to extract the x-api-key header.
@@ -87,6 +110,7 @@ def verify_api_key(x_api_key: str = Header(..., alias="x-api-key")) -> bool:
     Raises:
         HTTPException: If the API key is missing, invalid, or doesn't match
     """
+    settings = get_settings()
     if not settings.api_key:
         raise HTTPException(
             status_code=500,
@@ -99,11 +123,7 @@ def verify_api_key(x_api_key: str = Header(..., alias="x-api-key")) -> bool:
             detail="Missing x-api-key header"
         )
     
-    # Decrypt the incoming API key
-    decrypted_key = decrypt_api_key(x_api_key)
-    
-    # Compare with the expected API key
-    if decrypted_key != settings.api_key:
+    if not _is_valid_api_key(x_api_key, settings.api_key):
         raise HTTPException(
             status_code=401,
             detail="Invalid API key"
@@ -123,10 +143,9 @@ def encrypt_api_key(api_key: str) -> str:
     Returns:
         The encrypted API key
     """
+    settings = get_settings()
     if not settings.encryption_key:
         raise ValueError("ENCRYPTION_KEY not configured")
     
-    fernet_key = _get_fernet_key(settings.encryption_key)
-    fernet = Fernet(fernet_key)
-    encrypted = fernet.encrypt(api_key.encode())
+    encrypted = _fernet().encrypt(api_key.encode())
     return encrypted.decode()
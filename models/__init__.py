@@ -1,9 +1,14 @@
+import importlib
+
 from .api_models import HealthResponse
 from .vehicle_damage import (
     VehicleSide,
+    VEHICLE_SIDE_VALUES,
+    VEHICLE_SIDE_LOOKUP,
     VehicleInfo,
     EstimateOperation,
     DamageDescription,
+    DAMAGE_LIST_ADAPTER,
     ClassifyImagesRequest,
     ClassifyImagesResponse,
     AnalyzeSideImagesRequest,
@@ -11,23 +16,38 @@ from .vehicle_damage import (
     VehicleDamageAnalysisResponse,
     ChunkOutput,
 )
-from .rag_models import (
-    DamageDetectionResult,
-    RetrievedChunk,
-    RAGEstimateRequest,
-    RAGEstimateResponse,
-    GeneratedEstimate,
-    EstimateOperation as RAGEstimateOperation,
-    DamageDetectionRequest,
-    DamageDetectionResponse,
-)
+
+# RAG models are resolved on first access (PEP 562) so importing the vehicle
+# damage or health models does not pull in the RAG model chain.
+_LAZY_RAG_MODELS = {
+    "DamageDetectionResult": "DamageDetectionResult",
+    "RetrievedChunk": "RetrievedChunk",
+    "RAGEstimateRequest": "RAGEstimateRequest",
+    "RAGEstimateResponse": "RAGEstimateResponse",
+    "GeneratedEstimate": "GeneratedEstimate",
+    "RAGEstimateOperation": "EstimateOperation",
+    "DamageDetectionRequest": "DamageDetectionRequest",
+    "DamageDetectionResponse": "DamageDetectionResponse",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_RAG_MODELS:
+        value = getattr(importlib.import_module(".rag_models", __name__), _LAZY_RAG_MODELS[name])
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "HealthResponse",
     "VehicleSide",
+    "VEHICLE_SIDE_VALUES",
+    "VEHICLE_SIDE_LOOKUP",
     "VehicleInfo",
     "EstimateOperation",
     "DamageDescription",
+    "DAMAGE_LIST_ADAPTER",
     "ClassifyImagesRequest",
     "ClassifyImagesResponse",
     "AnalyzeSideImagesRequest",
@@ -1,9 +1,12 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from dataclasses import dataclass
+from typing import Annotated
 
+from pydantic import Field
 
-class HealthResponse(BaseModel):
+
+@dataclass(slots=True, frozen=True)
+class HealthResponse:
     """Health check response."""
-    status: str = Field(description="Health status")
-    gemini_configured: bool = Field(description="Whether Gemini API is configured")
-    qdrant_connected: bool = Field(description="Whether Qdrant is connected")
+    status: Annotated[str, Field(description="Health status")]
+    gemini_configured: Annotated[bool, Field(description="Whether Gemini API is configured")]
+    qdrant_connected: Annotated[bool, Field(description="Whether Qdrant is connected")]
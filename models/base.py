@@ -0,0 +1,17 @@
+"""Shared base model for API and pipeline models."""
+
+from pydantic import BaseModel, ConfigDict
+
+
+class FastModel(BaseModel):
+    """
+    Base model tuned for models built on every request.
+    
+    Schema/validator construction is deferred until a model is first used,
+    and defaults are trusted rather than re-validated on construction.
+    """
+    model_config = ConfigDict(
+        defer_build=True,
+        validate_default=False,
+        extra="ignore",
+    )
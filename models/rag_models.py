@@ -1,11 +1,15 @@
 """Models for RAG (Retrieval Augmented Generation) pipeline."""
 
-from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from dataclasses import dataclass, field
+from typing import Annotated, Optional, Literal
+
+from pydantic import Field
+
+from .base import FastModel
 from .vehicle_damage import VehicleInfo, DamageDescription, EstimateOperation
 
 
-class DamageDetectionResult(BaseModel):
+class DamageDetectionResult(FastModel):
     """Result from damage detection on a single image."""
     image_url: str = Field(description="S3 URL of the analyzed image")
     has_damage: bool = Field(description="Whether damage was detected in the image")
@@ -14,17 +18,18 @@ class DamageDetectionResult(BaseModel):
     confidence: float = Field(default=0.0, description="Confidence score for damage detection")
 
 
-class RetrievedChunk(BaseModel):
+@dataclass(slots=True, frozen=True)
+class RetrievedChunk:
     """A chunk retrieved from Qdrant vector database."""
-    score: float = Field(description="Similarity score")
-    content: str = Field(description="The damage description content")
-    vehicle_info: dict = Field(description="Vehicle info from the retrieved chunk")
-    side: str = Field(description="Side of vehicle from retrieved chunk")
-    damage_descriptions: list[dict] = Field(default_factory=list, description="Damage descriptions from chunk")
-    approved_estimate: dict = Field(default_factory=dict, description="Approved estimate from chunk")
+    score: Annotated[float, Field(description="Similarity score")]
+    content: Annotated[str, Field(description="The damage description content")]
+    vehicle_info: Annotated[dict, Field(description="Vehicle info from the retrieved chunk")]
+    side: Annotated[str, Field(description="Side of vehicle from retrieved chunk")]
+    damage_descriptions: Annotated[list[dict], Field(description="Damage descriptions from chunk")] = field(default_factory=list)
+    approved_estimate: Annotated[dict, Field(description="Approved estimate from chunk")] = field(default_factory=dict)
 
 
-class RAGEstimateRequest(BaseModel):
+class RAGEstimateRequest(FastModel):
     """Request model for RAG-based estimate generation."""
     vehicle_info: Optional[VehicleInfo] = Field(
         default=None,
@@ -56,17 +61,17 @@ class RAGEstimateRequest(BaseModel):
     )
 
 
-class EstimateOperation(BaseModel):
+class EstimateOperation(FastModel):
     """A single operation in the generated estimate."""
     Description: str = Field(description="Part or operation description")
     Operation: str = Field(description="Type of operation (Remove / Install, Remove / Replace, Repair, Overhaul, etc.)")
     LaborHours: Optional[float] = Field(default=None, description="Labor hours - only present for Repair operations")
     PartId: Optional[str] = Field(default=None, description="ID of the part from PSS data that needs to be replaced or repaired")
     
-    model_config = {"extra": "allow", "exclude_none": True}
+    model_config = {"exclude_none": True}
 
 
-class GeneratedEstimate(BaseModel):
+class GeneratedEstimate(FastModel):
     """The final generated estimate in approved_estimate format."""
     estimate: dict[str, list[EstimateOperation]] = Field(
         default_factory=dict,
@@ -74,7 +79,7 @@ class GeneratedEstimate(BaseModel):
     )
 
 
-class RAGEstimateResponse(BaseModel):
+class RAGEstimateResponse(FastModel):
     """Response model for RAG-based estimate generation."""
     success: bool = Field(description="Whether the estimate generation was successful")
     
@@ -106,7 +111,7 @@ class RAGEstimateResponse(BaseModel):
     error: Optional[str] = Field(default=None, description="Error message if generation failed")
 
 
-class DamageDetectionRequest(BaseModel):
+class DamageDetectionRequest(FastModel):
     """Request model for damage detection only (without estimate generation)."""
     bucket_url: Optional[str] = Field(
         default=None,
@@ -122,7 +127,7 @@ class DamageDetectionRequest(BaseModel):
     )
 
 
-class DamageDetectionResponse(BaseModel):
+class DamageDetectionResponse(FastModel):
     """Response model for damage detection only."""
     success: bool = Field(description="Whether detection was successful")
     total_images: int = Field(default=0, description="Total images processed")
@@ -1,9 +1,11 @@
 """Models for vehicle damage analysis."""
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, ConfigDict, Field, TypeAdapter
 from typing import Optional
 from enum import Enum
 
+from .base import FastModel
+
 
 class VehicleSide(str, Enum):
     """Vehicle image classification categories."""
@@ -21,8 +23,35 @@ class VehicleSide(str, Enum):
     
     UNKNOWN = "unknown"
 
-
-class VehicleInfo(BaseModel):
+    @staticmethod
+    def normalize(text: str) -> "VehicleSide":
+        """Resolve free-form side text (any case/padding, common aliases) to a side."""
+        return _SIDE_INDEX.get(text.strip().lower(), VehicleSide.UNKNOWN)
+
+
+# Precomputed lookups so hot paths avoid Enum value resolution
+VEHICLE_SIDE_VALUES: frozenset[str] = frozenset(side.value for side in VehicleSide)
+VEHICLE_SIDE_LOOKUP: dict[str, VehicleSide] = {side.value: side for side in VehicleSide}
+
+# Lowercased values plus the spellings classifiers and clients commonly use
+_SIDE_INDEX: dict[str, VehicleSide] = {
+    **VEHICLE_SIDE_LOOKUP,
+    "back": VehicleSide.REAR,
+    "top": VehicleSide.ROOF,
+    "driver": VehicleSide.LEFT,
+    "driver side": VehicleSide.LEFT,
+    "passenger": VehicleSide.RIGHT,
+    "passenger side": VehicleSide.RIGHT,
+    "engine/electrical": VehicleSide.ENGINE_ELECTRICAL,
+    "steering/suspension": VehicleSide.STEERING_SUSPENSION,
+    "frame/floor": VehicleSide.FRAME_FLOOR,
+    "ac": VehicleSide.AC,
+    "a.c.": VehicleSide.AC,
+    "hvac": VehicleSide.AC,
+}
+
+
+class VehicleInfo(FastModel):
     """Vehicle information model."""
     vin: str = Field(description="Vehicle Identification Number")
     make: str = Field(description="Vehicle manufacturer")
@@ -30,17 +59,25 @@ class VehicleInfo(BaseModel):
     year: int = Field(description="Vehicle year")
     body_type: str = Field(description="Vehicle body type (e.g., Sedan, SUV)")
 
+    model_config = {"frozen": True}
+
 
-class EstimateOperation(BaseModel):
+class EstimateOperation(FastModel):
     """Single operation in an approved estimate."""
     Description: str = Field(description="Part or operation description")
     Operation: str = Field(description="Type of operation (e.g., Remove / Install, Repair)")
-    LabourHours: Optional[float] = Field(default=None, description="Labour hours - only present for Repair operations")
+    LabourHours: Optional[float] = Field(
+        default=None,
+        # Some estimate sources send the US spelling
+        validation_alias=AliasChoices("LabourHours", "LaborHours"),
+        description="Labour hours - only present for Repair operations",
+    )
+    PartId: Optional[str] = Field(default=None, description="ID of the part from PSS data, when known")
     
-    model_config = {"extra": "allow", "exclude_none": True}
+    model_config = {"exclude_none": True, "frozen": True}
 
 
-class DamageDescription(BaseModel):
+class DamageDescription(FastModel):
     """Individual damage description from Gemini analysis."""
     location: str = Field(description="Location on the vehicle (e.g., Front Right Corner)")
     part: str = Field(description="Affected part name (e.g., Front Bumper Cover)")
@@ -50,8 +87,35 @@ class DamageDescription(BaseModel):
     end_position: str = Field(description="Ending position of damage")
     description: str = Field(description="Detailed description of the damage")
 
+    model_config = {"frozen": True}
+
+
+# Process-wide validator for whole damage lists, so a batch is validated in
+# one pydantic-core call instead of one model per item
+DAMAGE_LIST_ADAPTER = TypeAdapter(list[DamageDescription], config=ConfigDict(defer_build=True))
+
+
+# Shared example defaults for the request models below. Both models are frozen,
+# so a single instance can be handed out instead of copying one per request.
+_DEFAULT_VEHICLE_INFO = VehicleInfo.model_construct(
+    vin="4S4BTDNC3L3195200",
+    make="SUBARU",
+    model="OUTBACK 2.5i LIMITED FAMILIALE TI",
+    year=2020,
+    body_type="Sedan"
+)
+_DEFAULT_REAR_BUMPER_OPERATION = EstimateOperation.model_construct(
+    Description="Rear Bumper Cover",
+    Operation="Remove / Replace"
+)
+
+
+def _default_approved_estimate() -> dict[str, list[EstimateOperation]]:
+    """Fresh container around the shared default operation."""
+    return {"Rear Bumper": [_DEFAULT_REAR_BUMPER_OPERATION]}
+
 
-class ClassifyImagesRequest(BaseModel):
+class ClassifyImagesRequest(FastModel):
     """Request model for classifying images by vehicle side."""
     bucket_url: Optional[str] = Field(
         default="s3://ehsan-poc-estimate-true-claim/claims/test-claim/images/",
@@ -63,7 +127,7 @@ class ClassifyImagesRequest(BaseModel):
         description="Custom prompt for image classification. If provided, this will be used instead of the default prompt."
     )
 
-class ClassifyImagesResponse(BaseModel):
+class ClassifyImagesResponse(FastModel):
     """Response model for image classification."""
     success: bool = Field(description="Whether the classification was successful")
     classified_images: dict[str, list[str]] = Field(description="Images classified by side (front, rear, left, right, roof, unknown)")
@@ -73,7 +137,7 @@ class ClassifyImagesResponse(BaseModel):
 
 
 
-class AnalyzeSideImagesRequest(BaseModel):
+class AnalyzeSideImagesRequest(FastModel):
     """Request model for analyzing images of a specific side."""
     side: str = Field(default="rear", description="Side of the vehicle (front, rear, left, right, roof)")
     images: list[str] = Field(
@@ -90,21 +154,11 @@ class AnalyzeSideImagesRequest(BaseModel):
         description="List of S3 image URLs for this side"
     )
     vehicle_info: VehicleInfo = Field(
-        default=VehicleInfo(
-            vin="4S4BTDNC3L3195200",
-            make="SUBARU",
-            model="OUTBACK 2.5i LIMITED FAMILIALE TI",
-            year=2020,
-            body_type="Sedan"
-        ),
+        default_factory=lambda: _DEFAULT_VEHICLE_INFO,
         description="Vehicle information"
     )
     approved_estimate: dict[str, list[EstimateOperation]] = Field(
-        default={
-            "Rear Bumper": [
-                EstimateOperation(Description="Rear Bumper Cover", Operation="Remove / Replace")
-            ]
-        },
+        default_factory=_default_approved_estimate,
         description="Approved estimate operations by part category"
     )
     custom_damage_analysis_prompt: Optional[str] = Field(
@@ -131,28 +185,18 @@ class AnalyzeSideImagesRequest(BaseModel):
     )
 
 
-class VehicleDamageAnalysisRequest(BaseModel):
+class VehicleDamageAnalysisRequest(FastModel):
     """Request model for vehicle damage analysis."""
     bucket_url: Optional[str] = Field(
         default="s3://ehsan-poc-estimate-true-claim/claims/test-claim/images/",
         description="S3 bucket URL containing vehicle images (e.g., s3://bucket/claims/id/images/)"
     )
     vehicle_info: VehicleInfo = Field(
-        default=VehicleInfo(
-            vin="4S4BTDNC3L3195200",
-            make="SUBARU",
-            model="OUTBACK 2.5i LIMITED FAMILIALE TI",
-            year=2020,
-            body_type="Sedan"
-        ),
+        default_factory=lambda: _DEFAULT_VEHICLE_INFO,
         description="Vehicle information"
     )
     approved_estimate: dict[str, list[EstimateOperation]] = Field(
-        default={
-            "Rear Bumper": [
-                EstimateOperation(Description="Rear Bumper Cover", Operation="Remove / Replace")
-            ]
-        },
+        default_factory=_default_approved_estimate,
         description="Approved estimate operations by part category"
     )
     custom_classification_prompt: Optional[str] = Field(
@@ -181,7 +225,7 @@ class VehicleDamageAnalysisRequest(BaseModel):
     )
 
 
-class VehicleDamageAnalysisResponse(BaseModel):
+class VehicleDamageAnalysisResponse(FastModel):
     """Response model for vehicle damage analysis."""
     success: bool = Field(description="Whether the analysis was successful")
     vehicle_info: VehicleInfo = Field(description="Vehicle information")
@@ -193,7 +237,7 @@ class VehicleDamageAnalysisResponse(BaseModel):
     error: Optional[str] = Field(default=None, description="Error message if analysis failed")
 
 
-class ChunkOutput(BaseModel):
+class ChunkOutput(FastModel):
     """Complete chunk output matching the expected format."""
     vehicle_info: VehicleInfo = Field(description="Vehicle information")
     side: str = Field(description="Primary side analyzed")
@@ -1,17 +1,25 @@
 from .vehicle_damage import (
     IMAGE_CLASSIFICATION_PROMPT,
     DAMAGE_ANALYSIS_PROMPT,
+    DAMAGE_ANALYSIS_STATIC_PREFIX,
+    CLASSIFY_AND_ANALYZE_STATIC_PREFIX,
     MERGE_DAMAGE_PROMPT,
+    MERGE_DAMAGE_STATIC_PREFIX,
     get_classification_prompt,
     get_damage_analysis_prompt,
+    get_classify_and_analyze_prompt,
     get_merge_damage_prompt,
 )
 
 __all__ = [
     "IMAGE_CLASSIFICATION_PROMPT",
     "DAMAGE_ANALYSIS_PROMPT",
+    "DAMAGE_ANALYSIS_STATIC_PREFIX",
+    "CLASSIFY_AND_ANALYZE_STATIC_PREFIX",
     "MERGE_DAMAGE_PROMPT",
+    "MERGE_DAMAGE_STATIC_PREFIX",
     "get_classification_prompt",
     "get_damage_analysis_prompt",
+    "get_classify_and_analyze_prompt",
     "get_merge_damage_prompt",
 ]
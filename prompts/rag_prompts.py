@@ -1,7 +1,25 @@
 """Prompts for RAG (Retrieval Augmented Generation) pipeline."""
 
-import json
-
+from functools import lru_cache
+from operator import itemgetter
+from string import Formatter
+
+import orjson
+
+__all__ = [
+    "DAMAGE_DETECTION_PROMPT",
+    "DAMAGE_DETECTION_WITH_CONTEXT_PROMPT",
+    "ESTIMATE_GENERATION_PROMPT",
+    "get_damage_detection_prompt",
+    "get_damage_detection_with_context_prompt",
+    "get_damage_detection_prompt_for_vehicle",
+    "get_multi_image_detection_prompt",
+    "get_estimate_generation_prompt",
+    "format_vehicle_info",
+    "format_damage_descriptions",
+    "format_retrieved_chunks",
+    "format_pss_data",
+]
 
 DAMAGE_DETECTION_PROMPT = """<role>
 You are an expert vehicle damage assessor specializing in automotive collision analysis.
@@ -35,6 +53,14 @@ Respond in the exact JSON structure specified by the schema.
 </output_format>"""
 
 
+# Appended to either detection prompt when several images share one request
+MULTI_IMAGE_DETECTION_SUFFIX = """
+
+<multi_image>
+You are given {count} images, each preceded by its label "Image N" (N from 0 to {last_index}).
+Analyze every image independently, exactly as described above, and return one detection per image with image_index set to that image's label number.
+</multi_image>"""
+
 DAMAGE_DETECTION_WITH_CONTEXT_PROMPT = """<role>
 You are an expert vehicle damage assessor specializing in automotive collision analysis.
 </role>
@@ -151,6 +177,62 @@ Based on the damage descriptions provided, generate the repair estimate now. Inc
 </final_instruction>"""
 
 
+def _split_template(template: str) -> tuple:
+    """
+    Pre-split a str.format template into (literal, field name) segments.
+    
+    Literal braces ({{ }}) are unescaped by the parser just as str.format
+    would; the final segment has a field name of None.
+    """
+    return tuple((literal, field) for literal, field, _, _ in Formatter().parse(template))
+
+
+def _compile_template(template: str):
+    """
+    Build a renderer that joins the pre-split segments with the given values,
+    so the template is parsed once at import instead of on every call.
+    """
+    segments = _split_template(template)
+    
+    def render(**values) -> str:
+        parts = []
+        append = parts.append
+        for literal, field in segments:
+            append(literal)
+            if field is not None:
+                append(str(values[field]))
+        return "".join(parts)
+    
+    return render
+
+
+_damage_detection_with_context_template = _compile_template(DAMAGE_DETECTION_WITH_CONTEXT_PROMPT)
+_estimate_generation_segments = _split_template(ESTIMATE_GENERATION_PROMPT)
+
+
+# Damage description fields in display order, with the fallback used when a
+# detection omits one; a single itemgetter call extracts them all at C level
+_DAMAGE_FIELD_DEFAULTS = (
+    ('part', 'Unknown Part'),
+    ('location', 'Unknown Location'),
+    ('severity', 'Unknown'),
+    ('type', 'Unknown'),
+    ('start_position', 'N/A'),
+    ('end_position', 'N/A'),
+    ('description', 'N/A'),
+)
+_DAMAGE_FIELDS = itemgetter(*(key for key, _ in _DAMAGE_FIELD_DEFAULTS))
+_DAMAGE_ROW_TEMPLATE = (
+    "\n%s. **%s** at %s\n"
+    "   - Severity: %s\n"
+    "   - Type: %s\n"
+    "   - Position: %s to %s\n"
+    "   - Description: %s\n"
+)
+_OPERATION_FIELDS = itemgetter('Description', 'Operation')
+_VEHICLE_TEMPLATE = "%s %s %s (%s)"
+
+
 def get_damage_detection_prompt() -> str:
     """Get the basic damage detection prompt."""
     return DAMAGE_DETECTION_PROMPT
@@ -179,11 +261,47 @@ def get_damage_detection_with_context_prompt(
     if not all([year, make, model, body_type]):
         return DAMAGE_DETECTION_PROMPT
     
+    return _render_damage_detection_with_context_prompt(year, make, model, body_type, human_description)
+
+
+@lru_cache(maxsize=1024)
+def get_damage_detection_prompt_for_vehicle(vehicle_info, human_description: str = None) -> str:
+    """
+    Get damage detection prompt for a frozen VehicleInfo.
+    
+    VehicleInfo is hashable, so the model itself is the cache key and
+    repeat images of the same vehicle skip the field unpacking entirely.
+    
+    Args:
+        vehicle_info: VehicleInfo model
+        human_description: Human-provided damage description
+    
+    Returns:
+        The complete prompt string.
+    """
+    return get_damage_detection_with_context_prompt(
+        year=vehicle_info.year,
+        make=vehicle_info.make,
+        model=vehicle_info.model,
+        body_type=vehicle_info.body_type,
+        human_description=human_description,
+    )
+
+
+@lru_cache(maxsize=512)
+def _render_damage_detection_with_context_prompt(
+    year: int,
+    make: str,
+    model: str,
+    body_type: str,
+    human_description: str,
+) -> str:
+    """Render the context prompt; cached since every image of a claim shares it."""
     human_context = ""
     if human_description:
         human_context = f"The owner has described the damage as: \"{human_description}\"\n\nUse this as context but verify against what you observe."
     
-    return DAMAGE_DETECTION_WITH_CONTEXT_PROMPT.format(
+    return _damage_detection_with_context_template(
         year=year,
         make=make,
         model=model,
@@ -192,64 +310,117 @@ def get_damage_detection_with_context_prompt(
     )
 
 
+@lru_cache(maxsize=64)
+def get_multi_image_detection_prompt(base_prompt: str, count: int) -> str:
+    """
+    Extend a single-image detection prompt to cover ``count`` labelled images.
+    
+    Args:
+        base_prompt: The damage detection prompt for one image
+        count: Number of images in the request
+    
+    Returns:
+        The complete prompt string.
+    """
+    return base_prompt + MULTI_IMAGE_DETECTION_SUFFIX.format(count=count, last_index=count - 1)
+
+
 def format_vehicle_info(vehicle_info: dict = None) -> str:
     """Format vehicle info dict into a readable string."""
     if not vehicle_info:
         return "Not provided"
-    vehicle_str = f"{vehicle_info.get('year', 'N/A')} {vehicle_info.get('make', 'N/A')} {vehicle_info.get('model', 'N/A')} ({vehicle_info.get('body_type', 'N/A')})"
-    if vehicle_info.get('vin'):
-        vehicle_str += f"\nVIN: {vehicle_info['vin']}"
-    return vehicle_str
+    get = vehicle_info.get
+    return _format_vehicle_info(
+        get('year', 'N/A'),
+        get('make', 'N/A'),
+        get('model', 'N/A'),
+        get('body_type', 'N/A'),
+        get('vin'),
+    )
+
+
+@lru_cache(maxsize=256)
+def _format_vehicle_info(year, make, model, body_type, vin) -> str:
+    """Render the vehicle line from hashable fields so repeat vehicles hit the cache."""
+    vehicle_str = _VEHICLE_TEMPLATE % (year, make, model, body_type)
+    return f"{vehicle_str}\nVIN: {vin}" if vin else vehicle_str
 
 
 def format_damage_descriptions(damage_descriptions: list = None) -> str:
     """Format damage descriptions list into a readable string."""
     if not damage_descriptions:
         return "No damage detected"
-    damage_str = ""
+    parts = []
+    _write_damage_descriptions(parts.append, damage_descriptions)
+    return "".join(parts)
+
+
+def _write_damage_descriptions(append, damage_descriptions: list) -> None:
+    """Append the formatted damage descriptions piece by piece."""
     for i, damage in enumerate(damage_descriptions, 1):
         if isinstance(damage, dict):
-            damage_str += f"\n{i}. **{damage.get('part', 'Unknown Part')}** at {damage.get('location', 'Unknown Location')}\n"
-            damage_str += f"   - Severity: {damage.get('severity', 'Unknown')}\n"
-            damage_str += f"   - Type: {damage.get('type', 'Unknown')}\n"
-            damage_str += f"   - Position: {damage.get('start_position', 'N/A')} to {damage.get('end_position', 'N/A')}\n"
-            damage_str += f"   - Description: {damage.get('description', 'N/A')}\n"
+            try:
+                values = _DAMAGE_FIELDS(damage)
+            except KeyError:
+                values = tuple(damage.get(key, default) for key, default in _DAMAGE_FIELD_DEFAULTS)
+            append(_DAMAGE_ROW_TEMPLATE % (i, *values))
         else:
-            damage_str += f"\n{i}. {damage}\n"
-    return damage_str
+            append(f"\n{i}. {damage}\n")
 
 
 def format_retrieved_chunks(retrieved_chunks: list = None) -> str:
-    """Format retrieved chunks list into a readable string."""
+    """Format retrieved chunks (dicts or RetrievedChunk objects) into a readable string."""
     if not retrieved_chunks:
         return "No similar historical estimates found"
-    chunks_str = ""
+    parts = []
+    _write_retrieved_chunks(parts.append, retrieved_chunks)
+    return "".join(parts)
+
+
+def _write_retrieved_chunks(append, retrieved_chunks: list) -> None:
+    """Append the formatted historical estimates (dicts or RetrievedChunk) piece by piece."""
     for i, chunk in enumerate(retrieved_chunks, 1):
-        chunks_str += f"\n### Historical Estimate {i} (Similarity: {chunk.get('score', 0):.2f})\n"
-        chunks_str += f"**Vehicle**: {chunk.get('vehicle_info', {}).get('year', 'N/A')} {chunk.get('vehicle_info', {}).get('make', 'N/A')} {chunk.get('vehicle_info', {}).get('model', 'N/A')}\n"
-        chunks_str += f"**Side**: {chunk.get('side', 'N/A')}\n"
-        chunks_str += f"**Damage Description**: {chunk.get('content', 'N/A')}\n"
+        if isinstance(chunk, dict):
+            score = chunk.get('score', 0)
+            vehicle_info = chunk.get('vehicle_info', {})
+            side = chunk.get('side', 'N/A')
+            content = chunk.get('content', 'N/A')
+            approved_estimate = chunk.get('approved_estimate')
+        else:
+            # RetrievedChunk: fixed fields, read by plain attribute access
+            score = chunk.score
+            vehicle_info = chunk.vehicle_info
+            side = chunk.side
+            content = chunk.content
+            approved_estimate = chunk.approved_estimate
+        append(f"\n### Historical Estimate {i} (Similarity: {score:.2f})\n")
+        append(f"**Vehicle**: {vehicle_info.get('year', 'N/A')} {vehicle_info.get('make', 'N/A')} {vehicle_info.get('model', 'N/A')}\n")
+        append(f"**Side**: {side}\n")
+        append(f"**Damage Description**: {content}\n")
         
-        if chunk.get('approved_estimate'):
-            chunks_str += "**Approved Operations**:\n"
-            for category, operations in chunk.get('approved_estimate', {}).items():
-                chunks_str += f"  - {category}:\n"
+        if approved_estimate:
+            append("**Approved Operations**:\n")
+            for category, operations in approved_estimate.items():
+                append(f"  - {category}:\n")
                 for op in operations:
-                    desc = op.get('Description', 'N/A')
-                    operation = op.get('Operation', 'N/A')
+                    try:
+                        desc, operation = _OPERATION_FIELDS(op)
+                    except KeyError:
+                        desc, operation = op.get('Description', 'N/A'), op.get('Operation', 'N/A')
                     hours = op.get('LabourHours', '')
                     if hours:
-                        chunks_str += f"    - {desc}: {operation} ({hours} hrs)\n"
+                        append(f"    - {desc}: {operation} ({hours} hrs)\n")
                     else:
-                        chunks_str += f"    - {desc}: {operation}\n"
-    return chunks_str
+                        append(f"    - {desc}: {operation}\n")
 
 
 def format_pss_data(pss_data: dict = None) -> str:
     """Format PSS data dict into a readable string with part IDs highlighted."""
     if not pss_data:
         return "Not provided"
-    return json.dumps(pss_data, indent=2)
+    # orjson's C writer produces the same 2-space layout as json.dumps(indent=2),
+    # but keeps non-ASCII part names as UTF-8 instead of \u escapes
+    return orjson.dumps(pss_data, option=orjson.OPT_INDENT_2).decode()
 
 
 def get_estimate_generation_prompt(
@@ -272,12 +443,30 @@ def get_estimate_generation_prompt(
     Returns:
         The complete prompt string.
     """
-    return ESTIMATE_GENERATION_PROMPT.format(
-        vehicle_info=format_vehicle_info(vehicle_info),
-        damage_descriptions=format_damage_descriptions(damage_descriptions),
-        human_description=human_description or "Not provided",
-        retrieved_chunks=format_retrieved_chunks(retrieved_chunks),
-        pss_data=format_pss_data(pss_data),
-    )
-
-
+    # Stream every section into one parts list instead of building each
+    # section as its own string and then formatting them into the template
+    parts = []
+    append = parts.append
+    for literal, field in _estimate_generation_segments:
+        append(literal)
+        if field is None:
+            continue
+        if field == "vehicle_info":
+            append(format_vehicle_info(vehicle_info))
+        elif field == "damage_descriptions":
+            if damage_descriptions:
+                _write_damage_descriptions(append, damage_descriptions)
+            else:
+                append("No damage detected")
+        elif field == "human_description":
+            append(human_description or "Not provided")
+        elif field == "retrieved_chunks":
+            if retrieved_chunks:
+                _write_retrieved_chunks(append, retrieved_chunks)
+            else:
+                append("No similar historical estimates found")
+        elif field == "pss_data":
+            append(format_pss_data(pss_data))
+        else:
+            raise KeyError(field)
+    return "".join(parts)
@@ -1,5 +1,6 @@
 """Prompts for vehicle damage analysis using Gemini API."""
 
+from functools import cache, lru_cache
 
 IMAGE_CLASSIFICATION_PROMPT = """You are an expert vehicle damage assessor. Analyze this vehicle image and classify which side/view of the vehicle it shows.
 
@@ -16,12 +17,13 @@ Provide your classification with a confidence score between 0 and 1.
 Respond in the exact JSON structure specified."""
 
 
-DAMAGE_ANALYSIS_PROMPT = """You are an expert vehicle damage assessor analyzing images of a {year} {make} {model} ({body_type}).
+# The damage analysis and merge prompts are split into a static prefix and a
+# dynamic suffix. Everything that varies per request (vehicle, side, estimate,
+# damages) sits at the tail, so the leading bytes are identical across calls
+# and Gemini's implicit prefix caching can reuse them.
+DAMAGE_ANALYSIS_STATIC_PREFIX = """You are an expert vehicle damage assessor analyzing images of a vehicle.
 
-The vehicle has the following approved estimate for repairs:
-{approved_estimate}
-
-Analyze the provided images showing the {side} of the vehicle and identify ALL visible damage.
+Analyze the provided images showing the side of the vehicle given below and identify ALL visible damage.
 
 For each damage found, provide:
 1. **location**: Specific location on the vehicle (e.g., "Front Right Corner", "Rear Left Quarter Panel")
@@ -38,13 +40,63 @@ For each damage found, provide:
 
 Be thorough and precise. Describe what you actually see in the images. Cross-reference with the approved estimate parts when applicable.
 
-Respond in the exact JSON structure specified."""
+Respond in the exact JSON structure specified.
+"""
 
+DAMAGE_ANALYSIS_DYNAMIC_SUFFIX = """
+Vehicle: {year} {make} {model} ({body_type})
+Side shown in the images: {side}
 
-MERGE_DAMAGE_PROMPT = """You are an expert vehicle damage assessor. Based on the following individual damage descriptions from different views of a {year} {make} {model} ({body_type}), create a comprehensive merged narrative description.
+The vehicle has the following approved estimate for repairs:
+{approved_estimate}"""
+
+DAMAGE_ANALYSIS_PROMPT = DAMAGE_ANALYSIS_STATIC_PREFIX + DAMAGE_ANALYSIS_DYNAMIC_SUFFIX
+
+
+# Classification and damage analysis fused into one request for small claims.
+# Same prefix/suffix split as above; the images follow the prompt, each
+# preceded by its "Image N" label.
+CLASSIFY_AND_ANALYZE_STATIC_PREFIX = """You are an expert vehicle damage assessor analyzing a set of images of one vehicle.
+
+Each image is preceded by its label "Image N". Do two things:
+
+A. Classify every image into ONE of these categories, with a confidence score between 0 and 1:
+- "front": Shows the front of the vehicle (headlights, front bumper, grille visible)
+- "rear": Shows the rear of the vehicle (taillights, rear bumper, trunk/hatch visible)
+- "left": Shows the left side of the vehicle (driver side in US/Canada)
+- "right": Shows the right side of the vehicle (passenger side in US/Canada)
+- "roof": Shows the roof/top of the vehicle
+- "unknown": Cannot determine the vehicle side or not a vehicle image
+Return exactly one classification per image, with image_index set to that image's label number.
+
+B. Identify ALL visible damage across the images. For each damage found, provide:
+1. **side**: Side of the vehicle the damage is on ("front", "rear", "left", "right" or "roof")
+2. **location**: Specific location on the vehicle (e.g., "Front Right Corner", "Rear Left Quarter Panel")
+3. **part**: The specific part affected (e.g., "Front Bumper Cover", "Fender", "Door Panel")
+4. **severity**: Rate as "Minor", "Medium", or "Major"
+5. **type**: Type of damage (e.g., "Scuffing", "Scratches", "Dent", "Crack", "Broken/Shattered", "Paint Damage")
+6. **start_position**: Where the damage begins (e.g., "Below headlight assembly")
+7. **end_position**: Where the damage ends (e.g., "Bottom lip/valance edge")
+8. **description**: Detailed description of the damage including:
+   - Visual characteristics (color changes, texture, depth)
+   - Extent and spread of damage
+   - Impact indicators (direction, force evidence)
+   - Material condition (paint layers exposed, plastic stress marks)
+
+Report each damage once, even when several images show it. Be thorough and precise. Describe what you actually see in the images. Cross-reference with the approved estimate parts when applicable.
+
+Respond in the exact JSON structure specified.
+"""
+
+CLASSIFY_AND_ANALYZE_DYNAMIC_SUFFIX = """
+Vehicle: {year} {make} {model} ({body_type})
+Number of images: {count} (labelled Image 0 to Image {last_index})
+
+The vehicle has the following approved estimate for repairs:
+{approved_estimate}"""
 
-Individual damage descriptions:
-{damage_descriptions}
+
+MERGE_DAMAGE_STATIC_PREFIX = """You are an expert vehicle damage assessor. Based on the individual damage descriptions from different views of the vehicle given below, create a comprehensive merged narrative description.
 
 Create a single, coherent narrative that:
 1. Summarizes all damage points across the vehicle
@@ -55,9 +107,19 @@ Create a single, coherent narrative that:
 
 The narrative should be 2-4 sentences that capture the full extent of damage.
 
-Respond with just the merged description text, no JSON formatting."""
+Respond with just the merged description text, no JSON formatting.
+"""
+
+MERGE_DAMAGE_DYNAMIC_SUFFIX = """
+Vehicle: {year} {make} {model} ({body_type})
+
+Individual damage descriptions:
+{damage_descriptions}"""
+
+MERGE_DAMAGE_PROMPT = MERGE_DAMAGE_STATIC_PREFIX + MERGE_DAMAGE_DYNAMIC_SUFFIX
 
 
+@cache
 def get_classification_prompt() -> str:
     """Get the image classification prompt."""
     return IMAGE_CLASSIFICATION_PROMPT
@@ -85,32 +147,47 @@ def get_damage_analysis_prompt(
     Returns:
         The complete prompt string.
     """
-    estimate_str = ""
-    for part_category, operations in approved_estimate.items():
-        estimate_str += f"\n{part_category}:\n"
-        for op in operations:
-            # Handle both dict and Pydantic model
-            if hasattr(op, 'Description'):
-                desc = op.Description
-                operation = op.Operation
-                hours = getattr(op, 'LabourHours', None)
-            else:
-                desc = op.get('Description', op.get('description', ''))
-                operation = op.get('Operation', op.get('operation', ''))
-                hours = op.get('LabourHours', op.get('LaborHours', op.get('labor_hours', '')))
-            if hours:
-                estimate_str += f"  - {desc}: {operation} ({hours} hours)\n"
-            else:
-                estimate_str += f"  - {desc}: {operation}\n"
+    return DAMAGE_ANALYSIS_STATIC_PREFIX + DAMAGE_ANALYSIS_DYNAMIC_SUFFIX.format_map({
+        "year": year,
+        "make": make,
+        "model": model,
+        "body_type": body_type,
+        "side": side,
+        "approved_estimate": format_approved_estimate(approved_estimate),
+    })
+
+
+def get_classify_and_analyze_prompt(
+    year: int,
+    make: str,
+    model: str,
+    body_type: str,
+    image_count: int,
+    approved_estimate: dict,
+) -> str:
+    """
+    Get the fused classification and damage analysis prompt for a set of images.
+    
+    Args:
+        year: Vehicle year
+        make: Vehicle manufacturer
+        model: Vehicle model
+        body_type: Vehicle body type
+        image_count: Number of labelled images sent with the prompt
+        approved_estimate: Approved estimate operations
     
-    return DAMAGE_ANALYSIS_PROMPT.format(
-        year=year,
-        make=make,
-        model=model,
-        body_type=body_type,
-        side=side,
-        approved_estimate=estimate_str if estimate_str else "No approved estimate provided",
-    )
+    Returns:
+        The complete prompt string.
+    """
+    return CLASSIFY_AND_ANALYZE_STATIC_PREFIX + CLASSIFY_AND_ANALYZE_DYNAMIC_SUFFIX.format_map({
+        "year": year,
+        "make": make,
+        "model": model,
+        "body_type": body_type,
+        "count": image_count,
+        "last_index": image_count - 1,
+        "approved_estimate": format_approved_estimate(approved_estimate),
+    })
 
 
 def format_approved_estimate(approved_estimate: dict) -> str:
@@ -126,25 +203,54 @@ def format_approved_estimate(approved_estimate: dict) -> str:
     if not approved_estimate:
         return "No approved estimate provided"
     
-    estimate_str = ""
-    for part_category, operations in approved_estimate.items():
-        estimate_str += f"\n{part_category}:\n"
-        for op in operations:
-            # Handle both dict and Pydantic model
-            if hasattr(op, 'Description'):
-                desc = op.Description
-                operation = op.Operation
-                hours = getattr(op, 'LabourHours', None)
-            else:
-                desc = op.get('Description', op.get('description', ''))
-                operation = op.get('Operation', op.get('operation', ''))
-                hours = op.get('LabourHours', op.get('LaborHours', op.get('labor_hours', '')))
+    # Every side of a claim renders the same estimate; frozen EstimateOperation
+    # models are hashable, so the estimate itself can be the cache key
+    try:
+        key = tuple((category, tuple(operations)) for category, operations in approved_estimate.items())
+        return _render_approved_estimate(key)
+    except TypeError:
+        # Plain dict operations are unhashable
+        return _render_approved_estimate.__wrapped__(approved_estimate.items())
+
+
+@lru_cache(maxsize=256)
+def _render_approved_estimate(items) -> str:
+    """Render (category, operations) pairs into the estimate block."""
+    parts: list[str] = []
+    append = parts.append
+    for part_category, rows in _normalize_estimate(items):
+        append(f"\n{part_category}:\n")
+        for desc, operation, hours in rows:
             if hours:
-                estimate_str += f"  - {desc}: {operation} ({hours} hours)\n"
+                append(f"  - {desc}: {operation} ({hours} hours)\n")
             else:
-                estimate_str += f"  - {desc}: {operation}\n"
+                append(f"  - {desc}: {operation}\n")
     
-    return estimate_str if estimate_str else "No approved estimate provided"
+    return "".join(parts) or "No approved estimate provided"
+
+
+def _normalize_estimate(items) -> list[tuple[str, list[tuple]]]:
+    """
+    Resolve every operation to a (description, operation, hours) row up front.
+    
+    Models and dicts (with their alternate key spellings) are told apart once
+    per operation, so the render loop above is a plain pass over tuples.
+    """
+    normalized = []
+    for part_category, operations in items:
+        rows = []
+        for op in operations:
+            # Handle both dict and Pydantic model
+            if isinstance(op, dict):
+                rows.append((
+                    op.get('Description', op.get('description', '')),
+                    op.get('Operation', op.get('operation', '')),
+                    op.get('LabourHours', op.get('LaborHours', op.get('labor_hours', ''))),
+                ))
+            else:
+                rows.append((op.Description, op.Operation, getattr(op, 'LabourHours', None)))
+        normalized.append((part_category, rows))
+    return normalized
 
 
 def format_damage_descriptions_for_merge(damage_descriptions: list[dict]) -> str:
@@ -160,14 +266,15 @@ def format_damage_descriptions_for_merge(damage_descriptions: list[dict]) -> str
     if not damage_descriptions:
         return "No damage descriptions provided"
     
-    desc_str = ""
+    parts: list[str] = []
+    append = parts.append
     for i, damage in enumerate(damage_descriptions, 1):
-        desc_str += f"\n{i}. {damage.get('location', 'Unknown')} - {damage.get('part', 'Unknown')}:\n"
-        desc_str += f"   Severity: {damage.get('severity', 'Unknown')}\n"
-        desc_str += f"   Type: {damage.get('type', 'Unknown')}\n"
-        desc_str += f"   Description: {damage.get('description', 'No description')}\n"
+        append(f"\n{i}. {damage.get('location', 'Unknown')} - {damage.get('part', 'Unknown')}:\n")
+        append(f"   Severity: {damage.get('severity', 'Unknown')}\n")
+        append(f"   Type: {damage.get('type', 'Unknown')}\n")
+        append(f"   Description: {damage.get('description', 'No description')}\n")
     
-    return desc_str
+    return "".join(parts)
 
 
 def get_merge_damage_prompt(
@@ -190,10 +297,10 @@ def get_merge_damage_prompt(
     Returns:
         The complete prompt string.
     """
-    return MERGE_DAMAGE_PROMPT.format(
-        year=year,
-        make=make,
-        model=model,
-        body_type=body_type,
-        damage_descriptions=format_damage_descriptions_for_merge(damage_descriptions),
-    )
+    return MERGE_DAMAGE_STATIC_PREFIX + MERGE_DAMAGE_DYNAMIC_SUFFIX.format_map({
+        "year": year,
+        "make": make,
+        "model": model,
+        "body_type": body_type,
+        "damage_descriptions": format_damage_descriptions_for_merge(damage_descriptions),
+    })
@@ -1,31 +1,34 @@
 """Health check routes."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 from models import HealthResponse
-from config import settings
-from services import QdrantService
+from config import get_settings
+from routes.qdrant import get_qdrant_service
 
 router = APIRouter(tags=["Health"])
 
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(request: Request):
     """
     Check the health status of the application.
     
     Returns the status of Gemini API configuration and Qdrant connection.
     """
     # Check Gemini configuration
-    gemini_configured = bool(settings.gemini_api_key)
+    gemini_configured = bool(get_settings().gemini_api_key)
     
-    # Check Qdrant connection
-    qdrant_connected = False
-    try:
-        qdrant_service = QdrantService()
-        qdrant_connected = qdrant_service.is_connected()
-    except Exception:
-        pass
+    # Qdrant connectivity is refreshed in the background by the app lifespan;
+    # only check it inline when that monitor is not running
+    qdrant_connected = getattr(request.app.state, "qdrant_connected", None)
+    if qdrant_connected is None:
+        qdrant_connected = False
+        try:
+            qdrant_service = get_qdrant_service(request)
+            qdrant_connected = qdrant_service.is_connected()
+        except Exception:
+            pass
     
     return HealthResponse(
         status="healthy" if gemini_configured else "degraded",
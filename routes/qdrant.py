@@ -1,8 +1,11 @@
 """Routes for Qdrant vector database operations."""
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
+import asyncio
 
+from fastapi import APIRouter, HTTPException, Depends, Request
+from typing import AsyncIterator, Optional
+
+from config import settings
 from services import QdrantService
 from middleware.auth import verify_api_key
 
@@ -13,16 +16,50 @@ router = APIRouter(
 )
 
 
-def get_qdrant_service(collection_name: Optional[str] = None) -> QdrantService:
-    """Get or create the Qdrant service instance."""
-    return QdrantService(collection_name=collection_name)
+def get_qdrant_service(request: Request) -> QdrantService:
+    """Get or create the shared Qdrant service instance for the configured collection."""
+    services = getattr(request.app.state, "qdrant_services", None)
+    if services is None:
+        services = request.app.state.qdrant_services = {}
+    name = settings.qdrant_collection_name
+    service = services.get(name)
+    if service is None:
+        service = services[name] = QdrantService(collection_name=name)
+    return service
+
+
+def get_default_qdrant_service(request: Request) -> QdrantService:
+    """Dependency for the shared Qdrant service on the default collection."""
+    return get_qdrant_service(request)
+
+
+async def get_collection_qdrant_service(
+    request: Request,
+    collection_name: Optional[str] = None,
+) -> AsyncIterator[QdrantService]:
+    """
+    Dependency for the Qdrant service of a requested collection.
+    
+    The configured collection uses the shared service. Any other name comes
+    from the request, so its service is built for this request only and
+    closed afterwards instead of being kept (with its client pools) forever.
+    """
+    if not collection_name or collection_name == settings.qdrant_collection_name:
+        yield get_qdrant_service(request)
+        return
+    
+    service = await asyncio.to_thread(QdrantService, collection_name=collection_name)
+    try:
+        yield service
+    finally:
+        await asyncio.to_thread(service.close)
 
 
 @router.get("/search")
 async def search_qdrant(
     query: str,
     limit: int = 10,
-    collection_name: Optional[str] = None,
+    service: QdrantService = Depends(get_collection_qdrant_service),
 ):
     """
     Search for similar images based on a text query.
@@ -32,8 +69,6 @@ async def search_qdrant(
         limit: Maximum number of results to return.
         collection_name: Optional collection name to search in.
     """
-    service = get_qdrant_service(collection_name)
-    
     if not service.is_connected():
         raise HTTPException(status_code=503, detail="Qdrant is not connected")
     
@@ -49,15 +84,13 @@ async def search_qdrant(
 
 
 @router.get("/collection/info")
-async def get_collection_info(collection_name: Optional[str] = None):
+async def get_collection_info(service: QdrantService = Depends(get_collection_qdrant_service)):
     """
     Get information about the Qdrant collection.
     
     Args:
         collection_name: Optional collection name. Uses default if not specified.
     """
-    service = get_qdrant_service(collection_name)
-    
     if not service.is_connected():
         raise HTTPException(status_code=503, detail="Qdrant is not connected")
     
@@ -65,15 +98,13 @@ async def get_collection_info(collection_name: Optional[str] = None):
 
 
 @router.delete("/collection")
-async def delete_collection(collection_name: Optional[str] = None):
+async def delete_collection(service: QdrantService = Depends(get_collection_qdrant_service)):
     """
     Delete the Qdrant collection.
     
     Args:
         collection_name: Optional collection name. Uses default if not specified.
     """
-    service = get_qdrant_service(collection_name)
-    
     if not service.is_connected():
         raise HTTPException(status_code=503, detail="Qdrant is not connected")
     
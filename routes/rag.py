@@ -1,6 +1,6 @@
 """Routes for RAG (Retrieval Augmented Generation) pipeline."""
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 
 from models.rag_models import (
     RAGEstimateRequest,
@@ -16,13 +16,19 @@ router = APIRouter(
 )
 
 
-def get_rag_service() -> RAGService:
-    """Get or create the RAG service instance."""
-    return RAGService()
+def get_rag_service(request: Request) -> RAGService:
+    """Get or create the shared RAG service instance."""
+    service = getattr(request.app.state, "rag_service", None)
+    if service is None:
+        service = request.app.state.rag_service = RAGService()
+    return service
 
 
 @router.post("/estimate", response_model=RAGEstimateResponse)
-async def generate_rag_estimate(request: RAGEstimateRequest):
+async def generate_rag_estimate(
+    request: RAGEstimateRequest,
+    service: RAGService = Depends(get_rag_service),
+):
     """
     Generate a repair estimate using RAG pipeline.
     
@@ -82,7 +88,6 @@ async def generate_rag_estimate(request: RAGEstimateRequest):
             detail="Either damage_descriptions or merged_damage_description must be provided"
         )
     
-    service = get_rag_service()
     response = service.run_rag_pipeline(request)
     
     if not response.success:
@@ -91,4 +96,5 @@ async def generate_rag_estimate(request: RAGEstimateRequest):
             detail=response.error or "Failed to generate estimate"
         )
     
-    return response
+    # Serialized straight to JSON bytes, as in routes/vehicle_damage.py
+    return Response(content=response.model_dump_json(), media_type="application/json")
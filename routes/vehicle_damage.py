@@ -1,6 +1,10 @@
 """Routes for vehicle damage analysis."""
 
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import logging
+
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from pydantic import TypeAdapter
 from typing import Optional
 
 from models import (
@@ -12,8 +16,16 @@ from models import (
     ChunkOutput,
 )
 from services import VehicleDamageService, QdrantService
+from routes.qdrant import get_default_qdrant_service
 from middleware.auth import verify_api_key
 
+# Responses are serialized straight to JSON bytes by pydantic-core, skipping
+# FastAPI's response re-validation and jsonable_encoder pass. The declared
+# response_model is still used for the OpenAPI schema.
+_CHUNK_LIST_ADAPTER = TypeAdapter(list[ChunkOutput])
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/vehicle-damage",
     tags=["Vehicle Damage Analysis"],
@@ -21,18 +33,19 @@ router = APIRouter(
 )
 
 
-def get_vehicle_damage_service() -> VehicleDamageService:
-    """Get or create the vehicle damage service instance."""
-    return VehicleDamageService()
-
-
-def get_qdrant_service() -> QdrantService:
-    """Get or create the Qdrant service instance."""
-    return QdrantService()
+def get_vehicle_damage_service(request: Request) -> VehicleDamageService:
+    """Get or create the shared vehicle damage service instance."""
+    service = getattr(request.app.state, "vehicle_damage_service", None)
+    if service is None:
+        service = request.app.state.vehicle_damage_service = VehicleDamageService()
+    return service
 
 
 @router.post("/classify", response_model=ClassifyImagesResponse)
-async def classify_images(request: ClassifyImagesRequest):
+async def classify_images(
+    request: ClassifyImagesRequest,
+    service: VehicleDamageService = Depends(get_vehicle_damage_service),
+):
     """
     Step 1: Classify vehicle images by side.
     
@@ -53,9 +66,10 @@ async def classify_images(request: ClassifyImagesRequest):
             detail="Either bucket_url or image_urls must be provided"
         )
     
-    service = get_vehicle_damage_service()
-    
-    response = service.classify_images_only(
+    # Classification blocks on S3 and Gemini for the whole folder; run it in a
+    # worker thread so the event loop keeps serving other requests meanwhile
+    response = await asyncio.to_thread(
+        service.classify_images_only,
         bucket_url=request.bucket_url,
         custom_classification_prompt=request.custom_classification_prompt,
     )
@@ -66,14 +80,18 @@ async def classify_images(request: ClassifyImagesRequest):
             detail=response.error or "Failed to classify images"
         )
     
-    return response
+    return Response(content=response.model_dump_json(), media_type="application/json")
 
 
 
 
 
 @router.post("/analyze-side", response_model=ChunkOutput, response_model_exclude_none=True)
-async def analyze_side_images(request: AnalyzeSideImagesRequest):
+async def analyze_side_images(
+    request: AnalyzeSideImagesRequest,
+    service: VehicleDamageService = Depends(get_vehicle_damage_service),
+    qdrant_service: QdrantService = Depends(get_default_qdrant_service),
+):
     """
     Step 2: Analyze images for a specific side and produce chunk output.
     
@@ -104,9 +122,8 @@ async def analyze_side_images(request: AnalyzeSideImagesRequest):
             detail="images must be provided"
         )
     
-    service = get_vehicle_damage_service()
-    
-    chunk = service.analyze_side_images(
+    chunk = await asyncio.to_thread(
+        service.analyze_side_images,
         side=request.side,
         images=request.images,
         vehicle_info=request.vehicle_info,
@@ -119,18 +136,43 @@ async def analyze_side_images(request: AnalyzeSideImagesRequest):
     )
     
     # Save chunk to Qdrant
+    await asyncio.to_thread(_save_chunk, qdrant_service, chunk)
+    
+    return Response(content=chunk.model_dump_json(exclude_none=True), media_type="application/json")
+
+
+def _save_chunk(qdrant_service: QdrantService, chunk: ChunkOutput) -> None:
+    """Upload one chunk, logging rather than raising on failure."""
     try:
-        qdrant_service = get_qdrant_service()
         if qdrant_service.is_connected():
             qdrant_service.upload_damage_chunk(chunk)
     except Exception as e:
-        print(f"Warning: Failed to save chunk to Qdrant: {e}")
+        logger.warning("Failed to save chunk to Qdrant: %s", e)
+
+
+def _save_chunks(qdrant_service: QdrantService, chunks: list[ChunkOutput]) -> None:
+    """Upload chunks in one batch, retrying one at a time if the batch fails."""
+    try:
+        if not qdrant_service.is_connected():
+            return
+        qdrant_service.upload_damage_chunks(chunks)
+        return
+    except Exception as e:
+        logger.warning("Batch save of %d chunks to Qdrant failed, retrying individually: %s", len(chunks), e)
     
-    return chunk
+    for chunk in chunks:
+        try:
+            qdrant_service.upload_damage_chunk(chunk)
+        except Exception as e:
+            logger.warning("Failed to save chunk to Qdrant: %s", e)
 
 
 @router.post("/analyze/chunks", response_model=list[ChunkOutput], response_model_exclude_none=True)
-async def analyze_vehicle_damage_chunks(request: VehicleDamageAnalysisRequest):
+async def analyze_vehicle_damage_chunks(
+    request: VehicleDamageAnalysisRequest,
+    service: VehicleDamageService = Depends(get_vehicle_damage_service),
+    qdrant_service: QdrantService = Depends(get_default_qdrant_service),
+):
     """
     Analyze vehicle damage and return chunks per side.
     
@@ -152,10 +194,9 @@ async def analyze_vehicle_damage_chunks(request: VehicleDamageAnalysisRequest):
             detail="bucket_url must be provided"
         )
     
-    service = get_vehicle_damage_service()
-    
     # First classify images by side
-    classify_response = service.classify_images_only(
+    classify_response = await asyncio.to_thread(
+        service.classify_images_only,
         bucket_url=request.bucket_url,
         custom_classification_prompt=request.custom_classification_prompt,
     )
@@ -166,15 +207,8 @@ async def analyze_vehicle_damage_chunks(request: VehicleDamageAnalysisRequest):
             detail=classify_response.error or "Failed to classify images"
         )
     
-    chunks = []
-    qdrant_service = get_qdrant_service()
-    
-    # Analyze each side that has images
-    for side, images in classify_response.classified_images.items():
-        if not images or side == "unknown":
-            continue
-        
-        chunk = service.analyze_side_images(
+    def analyze(side: str, images: list[str]) -> ChunkOutput:
+        return service.analyze_side_images(
             side=side,
             images=images,
             vehicle_info=request.vehicle_info,
@@ -185,27 +219,56 @@ async def analyze_vehicle_damage_chunks(request: VehicleDamageAnalysisRequest):
             mitchell_url_key=request.mitchell_url_key,
             account_id=request.account_id,
         )
-        
-        # Save chunk to Qdrant
-        try:
-            if qdrant_service.is_connected():
-                qdrant_service.upload_damage_chunk(chunk)
-        except Exception as e:
-            print(f"Warning: Failed to save chunk to Qdrant: {e}")
-        
-        chunks.append(chunk)
     
-    if not chunks:
+    # Analyze each side that has images concurrently; the Gemini and S3 calls
+    # are blocking I/O, so each side runs in a worker thread
+    sides = [
+        (side, images)
+        for side, images in classify_response.classified_images.items()
+        if images and side != "unknown"
+    ]
+    if not sides:
         raise HTTPException(
             status_code=400,
             detail="No valid images found for any side"
         )
     
-    return chunks
+    # Every side runs to completion before failures are reported, so no
+    # worker thread is left running detached from the request
+    results = await asyncio.gather(
+        *(asyncio.to_thread(analyze, side, images) for side, images in sides),
+        return_exceptions=True,
+    )
+    
+    failures = [
+        (side, result)
+        for (side, _), result in zip(sides, results)
+        if isinstance(result, Exception)
+    ]
+    if failures:
+        for side, error in failures:
+            logger.warning("Failed to analyze %s images: %s", side, error)
+        # Upstream (Gemini/S3) failures are not the client's fault
+        raise HTTPException(
+            status_code=502,
+            detail="Failed to analyze " + ", ".join(f"{side} images: {error}" for side, error in failures),
+        )
+    
+    # Save all chunks to Qdrant in one batched embed + upsert
+    chunks = list(results)
+    await asyncio.to_thread(_save_chunks, qdrant_service, chunks)
+    
+    return Response(
+        content=_CHUNK_LIST_ADAPTER.dump_json(chunks, exclude_none=True),
+        media_type="application/json",
+    )
 
 
 @router.post("/save-chunk")
-async def save_chunk_to_qdrant(chunk: ChunkOutput):
+async def save_chunk_to_qdrant(
+    chunk: ChunkOutput,
+    qdrant_service: QdrantService = Depends(get_default_qdrant_service),
+):
     """
     Save a damage analysis chunk to Qdrant vector database.
     
@@ -218,13 +281,11 @@ async def save_chunk_to_qdrant(chunk: ChunkOutput):
     Returns:
         Success status and the generated chunk ID.
     """
-    qdrant_service = get_qdrant_service()
-    
     if not qdrant_service.is_connected():
         raise HTTPException(status_code=503, detail="Qdrant is not connected")
     
     try:
-        chunk_id = qdrant_service.upload_damage_chunk(chunk)
+        chunk_id = await asyncio.to_thread(qdrant_service.upload_damage_chunk, chunk)
         return {
             "success": True,
             "chunk_id": chunk_id,
@@ -18,6 +18,7 @@ import base64
 import hashlib
 import os
 import sys
+from functools import lru_cache
 
 from cryptography.fernet import Fernet
 
@@ -31,6 +32,12 @@ def get_fernet_key(encryption_key: str) -> bytes:
     return base64.urlsafe_b64encode(key_hash)
 
 
+@lru_cache(maxsize=4)
+def _fernet_for(encryption_key: str) -> Fernet:
+    """Build the Fernet instance for an encryption key once and reuse it."""
+    return Fernet(get_fernet_key(encryption_key))
+
+
 def encrypt_api_key(api_key: str, encryption_key: str) -> str:
     """
     Encrypt an API key using Fernet encryption.
@@ -42,9 +49,7 @@ def encrypt_api_key(api_key: str, encryption_key: str) -> str:
     Returns:
         The encrypted API key (base64 encoded)
     """
-    fernet_key = get_fernet_key(encryption_key)
-    fernet = Fernet(fernet_key)
-    encrypted = fernet.encrypt(api_key.encode())
+    encrypted = _fernet_for(encryption_key).encrypt(api_key.encode())
     return encrypted.decode()
 
 
@@ -59,9 +64,7 @@ def decrypt_api_key(encrypted_key: str, encryption_key: str) -> str:
     Returns:
         The decrypted API key
     """
-    fernet_key = get_fernet_key(encryption_key)
-    fernet = Fernet(fernet_key)
-    decrypted = fernet.decrypt(encrypted_key.encode())
+    decrypted = _fernet_for(encryption_key).decrypt(encrypted_key.encode())
     return decrypted.decode()
 
 
@@ -0,0 +1,119 @@
+"""In-memory and persistent on-disk cache for Gemini embeddings."""
+
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+# Vectors kept in the in-process LRU in front of SQLite (~3 KB each at 768 dims)
+MEMORY_CACHE_SIZE = 4096
+
+
+class EmbeddingCache:
+    """Normalized embedding vectors keyed by content hash.
+
+    Lookups go to an in-process LRU first and then, when a path is given, to
+    a SQLite table that persists across restarts.
+    """
+
+    def __init__(self, path: Optional[Path] = None, memory_size: int = MEMORY_CACHE_SIZE):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Location of the SQLite file, or None for a memory-only cache.
+            memory_size: Maximum number of vectors held in memory.
+        """
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._memory_size = memory_size
+
+        self._conn = None
+        if path is not None:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Shared across the request threadpool; access is serialized by the lock
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, dimensions: int, task_type: str, text: str) -> bytes:
+        """Build the cache key for one embedding request."""
+        return hashlib.sha256(f"{model}|{dimensions}|{task_type}|{text}".encode()).digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Return the cached vector for ``key``, or None on a miss."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """Return the cached vectors for every key that is present."""
+        found: dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+
+            pending = [key for key in keys if key not in found]
+            if pending and self._conn is not None:
+                placeholders = ",".join("?" * len(pending))
+                rows = self._conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({placeholders})", pending
+                ).fetchall()
+                for key, vec in rows:
+                    key = bytes(key)
+                    found[key] = self._remember(key, np.frombuffer(vec, dtype=np.float32))
+        return found
+
+    def set_many(self, items: list[tuple[bytes, np.ndarray]]) -> None:
+        """Store several vectors in one transaction."""
+        if not items:
+            return
+        with self._lock:
+            for key, vector in items:
+                # Own, read-only copy: callers may hold views into a larger batch
+                vector = np.array(vector, dtype=np.float32)
+                vector.setflags(write=False)
+                self._remember(key, vector)
+            if self._conn is not None:
+                rows = [
+                    (key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in items
+                ]
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)", rows
+                    )
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> np.ndarray:
+        """Insert into the memory LRU, evicting the oldest entry; caller holds the lock."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+        return vector
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@lru_cache(maxsize=None)
+def get_embedding_cache(path: Optional[Path] = None) -> EmbeddingCache:
+    """Return the process-wide cache for ``path`` so every service shares one instance."""
+    return EmbeddingCache(path)
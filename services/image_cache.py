@@ -0,0 +1,52 @@
+"""In-memory cache for downloaded S3 images."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ImageCache(Generic[T]):
+    """Size-bounded LRU of images keyed by S3 URL, expiring after a TTL.
+
+    Claims are re-uploaded over the same keys, so an entry is only trusted
+    for ``ttl`` seconds; after that the image is fetched from S3 again.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Create an empty cache.
+
+        Args:
+            max_size: Maximum number of images kept.
+            ttl: Seconds an image stays valid; 0 disables caching.
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, T]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, s3_url: str) -> Optional[T]:
+        """Return the cached image for a URL, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(s3_url)
+            if entry is None:
+                return None
+            inserted_at, value = entry
+            if time.monotonic() - inserted_at >= self._ttl:
+                del self._entries[s3_url]
+                return None
+            self._entries.move_to_end(s3_url)
+            return value
+
+    def set(self, s3_url: str, value: T) -> None:
+        """Store an image, evicting the least recently used one when full."""
+        if self._ttl <= 0:
+            return
+        with self._lock:
+            self._entries[s3_url] = (time.monotonic(), value)
+            self._entries.move_to_end(s3_url)
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
@@ -2,9 +2,11 @@
 
 import json
 import hashlib
+import uuid
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
+from itertools import chain
 
 import numpy as np
 from google import genai
@@ -15,6 +17,49 @@ from qdrant_client.http.exceptions import UnexpectedResponse
 
 from config import settings
 from models.vehicle_damage import ChunkOutput
+from services.embedding_cache import get_embedding_cache
+from services.retrieval_cache import get_retrieval_cache
+
+
+# ChunkOutput fields copied into the Qdrant payload; estimate operations keep
+# only the columns the payload has always carried
+_CHUNK_PAYLOAD_FIELDS = {
+    "vehicle_info": True,
+    "side": True,
+    "images": True,
+    "damage_descriptions": True,
+    "approved_estimate": {"__all__": {"__all__": {"Description", "Operation", "LabourHours"}}},
+}
+
+
+# Rank on the int8-quantized index, then rescore candidates on the originals
+_SEARCH_PARAMS = qdrant_models.SearchParams(
+    quantization=qdrant_models.QuantizationSearchParams(rescore=True),
+)
+
+
+# Namespace for deterministic chunk point IDs (uuid5 of VIN | side | content hash)
+CHUNK_ID_NAMESPACE = uuid.UUID("6f1c1f3e-4b7a-5d2e-9c1a-3e8b2f0d7a41")
+
+
+def _chunk_point_id(chunk: ChunkOutput) -> str:
+    """Deterministic point ID, so re-uploading the same chunk lands on the same point."""
+    # Hash the whole chunk, so a changed estimate or claim ID is a new point
+    content_hash = hashlib.blake2b(chunk.model_dump_json(exclude_none=True).encode(), digest_size=16).hexdigest()
+    return str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{chunk.vehicle_info.vin}|{chunk.side}|{content_hash}"))
+
+
+def _normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize each row of a 2-D float array in place and return it."""
+    # Only the N-element norm vector is allocated; zero rows stay zero
+    norms = np.einsum("ij,ij->i", embeddings, embeddings)
+    # Full-size (3072-d) Gemini embeddings already come back unit-norm
+    if np.all(np.abs(norms - 1.0) < 1e-6):
+        return embeddings
+    np.sqrt(norms, out=norms)
+    np.maximum(norms, 1e-12, out=norms)
+    embeddings /= norms[:, None]
+    return embeddings
 
 
 class QdrantService:
@@ -24,6 +69,17 @@ class QdrantService:
     # Using 768 for efficiency while maintaining quality
     VECTOR_SIZE = 768
     EMBEDDING_MODEL = "gemini-embedding-001"
+    # Gemini task types for stored documents and for search queries
+    DOCUMENT_TASK_TYPE = "RETRIEVAL_DOCUMENT"
+    QUERY_TASK_TYPE = "RETRIEVAL_QUERY"
+    # Maximum texts per embed_content request
+    EMBEDDING_BATCH_SIZE = 100
+    # Bulk ingestion: points per upload request and parallel upload workers
+    BULK_UPLOAD_BATCH_SIZE = 256
+    BULK_UPLOAD_PARALLEL = 8
+    # Qdrant's default indexing_threshold (KB), restored only when the
+    # collection does not report its effective value
+    DEFAULT_INDEXING_THRESHOLD = 20000
     
     def __init__(self, collection_name: Optional[str] = None):
         """
@@ -35,27 +91,98 @@ class QdrantService:
         self.client = QdrantClient(
             host=settings.qdrant_host,
             port=settings.qdrant_port,
+            grpc_port=settings.qdrant_grpc_port,
+            prefer_grpc=settings.qdrant_prefer_grpc,
+            pool_size=settings.qdrant_pool_size,
+            timeout=settings.qdrant_timeout,
         )
         self.collection_name = collection_name or settings.qdrant_collection_name
         
         # Initialize Gemini client for embeddings
         self.genai_client = genai.Client(api_key=settings.gemini_api_key)
+        
+        # Embedding configs are immutable per task type, so build them once
+        self._embed_configs = {
+            task_type: types.EmbedContentConfig(
+                task_type=task_type,
+                output_dimensionality=self.VECTOR_SIZE,
+            )
+            for task_type in (self.DOCUMENT_TASK_TYPE, self.QUERY_TASK_TYPE)
+        }
+        
+        # In-memory LRU (plus the persistent SQLite cache unless disabled) so
+        # repeated texts skip the embedding round-trip
+        self.embedding_cache = get_embedding_cache(
+            settings.embedding_cache_path if settings.embedding_cache_enabled else None
+        )
+        
+        # Search results shared by every worker through SQLite; cleared on each
+        # write through this service and otherwise expiring after the TTL
+        self.retrieval_cache = (
+            get_retrieval_cache(settings.retrieval_cache_path, settings.retrieval_cache_ttl)
+            if settings.retrieval_cache_ttl > 0
+            else None
+        )
+        
+        # Set once the collection is known to exist, so later calls skip the check
+        self._collection_ready = False
     
-    def _ensure_collection_exists(self):
-        """Ensure the collection exists, creating it if necessary."""
+    def _ensure_collection_exists(self) -> bool:
+        """
+        Ensure the collection exists, creating it if necessary.
+        
+        Returns:
+            True if the collection was created by this call.
+        """
+        if self._collection_ready:
+            return False
+        
+        created = False
         try:
             self.client.get_collection(self.collection_name)
         except (UnexpectedResponse, Exception):
             # Collection doesn't exist, create it
+            # Vectors are unit-normalized, so int8 scalar quantization keeps the
+            # cosine ranking while cutting vector memory 4x; Qdrant rescores
+            # the top candidates against the original vectors on search
             self.client.create_collection(
                 collection_name=self.collection_name,
                 vectors_config=qdrant_models.VectorParams(
                     size=self.VECTOR_SIZE,
                     distance=qdrant_models.Distance.COSINE,
+                    on_disk=False,
+                ),
+                quantization_config=qdrant_models.ScalarQuantization(
+                    scalar=qdrant_models.ScalarQuantizationConfig(
+                        type=qdrant_models.ScalarType.INT8,
+                        always_ram=True,
+                    ),
                 ),
             )
+            created = True
+        
+        self._collection_ready = True
+        return created
+    
+    def finalize_bulk_load(self, indexing_threshold: Optional[int] = None) -> None:
+        """
+        Re-enable HNSW indexing after a bulk load.
+        
+        Args:
+            indexing_threshold: Threshold to restore, normally the collection's
+                effective value read before the load. Falls back to Qdrant's
+                default (DEFAULT_INDEXING_THRESHOLD) when unknown.
+        """
+        if indexing_threshold is None:
+            indexing_threshold = self.DEFAULT_INDEXING_THRESHOLD
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            optimizers_config=qdrant_models.OptimizersConfigDiff(
+                indexing_threshold=indexing_threshold,
+            ),
+        )
     
-    def _generate_embedding(self, text: str) -> list[float]:
+    def _generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding using Gemini embedding model.
         
@@ -63,29 +190,29 @@ class QdrantService:
             text: Text to embed.
         
         Returns:
-            List of floats representing the embedding.
+            Normalized float32 vector representing the embedding.
         """
-        result = self.genai_client.models.embed_content(
-            model=self.EMBEDDING_MODEL,
-            contents=text,
-            config=types.EmbedContentConfig(
-                task_type="RETRIEVAL_DOCUMENT",
-                output_dimensionality=self.VECTOR_SIZE
-            )
-        )
+        return self._generate_embeddings([text])[0]
+    
+    def _generate_embeddings(self, texts: list[str]) -> list[np.ndarray]:
+        """
+        Generate document embeddings for several texts in one request per batch.
         
-        # Get the embedding values and normalize for better similarity
-        embedding_values = result.embeddings[0].values
+        Args:
+            texts: Texts to embed.
         
-        # Normalize the embedding
-        embedding_np = np.array(embedding_values)
-        norm = np.linalg.norm(embedding_np)
-        if norm > 0:
-            embedding_np = embedding_np / norm
+        Returns:
+            One normalized embedding per text, in input order.
+        """
+        embeddings: list[np.ndarray] = []
+        for start in range(0, len(texts), self.EMBEDDING_BATCH_SIZE):
+            embeddings.extend(
+                self._embed_cached(texts[start:start + self.EMBEDDING_BATCH_SIZE], self.DOCUMENT_TASK_TYPE)
+            )
         
-        return embedding_np.tolist()
+        return embeddings
     
-    def _generate_query_embedding(self, text: str) -> list[float]:
+    def _generate_query_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for search queries using Gemini embedding model.
         Uses RETRIEVAL_QUERY task type for better search results.
@@ -94,31 +221,72 @@ class QdrantService:
             text: Query text to embed.
         
         Returns:
-            List of floats representing the embedding.
+            Normalized float32 vector representing the embedding.
+        """
+        # Collapse whitespace so reformatted copies of a query share a cache entry
+        return self._embed_cached([" ".join(text.split())], self.QUERY_TASK_TYPE)[0]
+    
+    def _embed_cached(self, texts: list[str], task_type: str) -> list[np.ndarray]:
+        """
+        Embed one batch of texts, answering from the embedding cache where possible.
+        
+        Args:
+            texts: Texts to embed (at most EMBEDDING_BATCH_SIZE).
+            task_type: Gemini embedding task type.
+        
+        Returns:
+            One normalized embedding per text, in input order.
+        """
+        # Each distinct text is embedded at most once per batch
+        unique_texts = list(dict.fromkeys(texts))
+        keys = {
+            text: self.embedding_cache.make_key(self.EMBEDDING_MODEL, self.VECTOR_SIZE, task_type, text)
+            for text in unique_texts
+        }
+        cached = self.embedding_cache.get_many(list(keys.values()))
+        missing = [text for text in unique_texts if keys[text] not in cached]
+        if missing:
+            fresh = self._embed_batch(missing, task_type)
+            new_items = [(keys[text], vector) for text, vector in zip(missing, fresh)]
+            self.embedding_cache.set_many(new_items)
+            cached.update(new_items)
+        
+        return [cached[keys[text]] for text in texts]
+    
+    def _embed_batch(self, texts: list[str], task_type: str) -> np.ndarray:
+        """
+        Call the Gemini embedding model for one batch of texts.
+        
+        Args:
+            texts: Texts to embed (at most EMBEDDING_BATCH_SIZE).
+            task_type: Gemini embedding task type.
+        
+        Returns:
+            Normalized float32 embeddings, one row per text, in input order.
         """
         result = self.genai_client.models.embed_content(
             model=self.EMBEDDING_MODEL,
-            contents=text,
-            config=types.EmbedContentConfig(
-                task_type="RETRIEVAL_QUERY",
-                output_dimensionality=self.VECTOR_SIZE
-            )
+            contents=texts,
+            config=self._embed_configs[task_type],
         )
         
-        # Get the embedding values and normalize
-        embedding_values = result.embeddings[0].values
-        embedding_np = np.array(embedding_values)
-        norm = np.linalg.norm(embedding_np)
-        if norm > 0:
-            embedding_np = embedding_np / norm
-        
-        return embedding_np.tolist()
+        # Stream the values into one exactly-sized float32 block, then
+        # normalize it in place for better similarity. float32 matches both
+        # Qdrant's storage and the embedding cache.
+        rows = len(result.embeddings)
+        embedding_np = np.fromiter(
+            chain.from_iterable(embedding.values for embedding in result.embeddings),
+            dtype=np.float32,
+            count=rows * self.VECTOR_SIZE,
+        ).reshape(rows, self.VECTOR_SIZE)
+        return _normalize_rows(embedding_np)
     
     def search(
         self,
         query: str,
         limit: int = 10,
         score_threshold: Optional[float] = None,
+        payload_fields: Optional[list[str]] = None,
     ) -> list[dict]:
         """
         Search for similar images based on a text query.
@@ -127,30 +295,86 @@ class QdrantService:
             query: Text query to search for.
             limit: Maximum number of results to return.
             score_threshold: Minimum similarity score threshold.
+            payload_fields: Payload keys to return; the full payload if omitted.
         
         Returns:
             List of matching results with scores.
         """
+        return self.search_batch([query], limit, score_threshold, payload_fields)[0]
+    
+    def search_batch(
+        self,
+        queries: list[str],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        payload_fields: Optional[list[str]] = None,
+    ) -> list[list[dict]]:
+        """
+        Search for several text queries with one embedding call and one Qdrant request.
+        
+        Args:
+            queries: Text queries to search for (at most EMBEDDING_BATCH_SIZE).
+            limit: Maximum number of results per query.
+            score_threshold: Minimum similarity score threshold.
+            payload_fields: Payload keys to return; the full payload if omitted.
+        
+        Returns:
+            One list of matching results with scores (and point IDs) per query,
+            in input order.
+        """
+        queries = [" ".join(query.split()) for query in queries]
+        results: list[Optional[list[dict]]] = [None] * len(queries)
+        
+        cache_keys = [None] * len(queries)
+        if self.retrieval_cache is not None:
+            for index, query in enumerate(queries):
+                cache_keys[index] = self.retrieval_cache.make_key(
+                    self.collection_name, query, limit, score_threshold, payload_fields
+                )
+                results[index] = self.retrieval_cache.get(cache_keys[index])
+        
+        missing = [index for index, hits in enumerate(results) if hits is None]
+        if not missing:
+            return results
+        
         self._ensure_collection_exists()
         
-        # Generate embedding for query using RETRIEVAL_QUERY task type
-        query_embedding = self._generate_query_embedding(query)
+        # Generate embeddings for the queries using RETRIEVAL_QUERY task type
+        query_embeddings = self._embed_cached([queries[index] for index in missing], self.QUERY_TASK_TYPE)
         
-        # Search using query_points (newer Qdrant API)
-        results = self.client.query_points(
-            collection_name=self.collection_name,
-            query=query_embedding,
-            limit=limit,
-            score_threshold=score_threshold,
-        )
+        # Search using query_batch_points (newer Qdrant API), one request per query
+        try:
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[
+                    qdrant_models.QueryRequest(
+                        query=embedding.tolist(),
+                        limit=limit,
+                        score_threshold=score_threshold,
+                        params=_SEARCH_PARAMS,
+                        with_payload=payload_fields or True,
+                    )
+                    for embedding in query_embeddings
+                ],
+            )
+        except Exception:
+            # The collection may have been dropped elsewhere; re-check next call
+            self._collection_ready = False
+            raise
         
-        return [
-            {
-                "score": hit.score,
-                "payload": hit.payload,
-            }
-            for hit in results.points
-        ]
+        for index, response in zip(missing, responses):
+            hits = [
+                {
+                    "id": str(hit.id),
+                    "score": hit.score,
+                    "payload": hit.payload,
+                }
+                for hit in response.points
+            ]
+            if cache_keys[index] is not None:
+                self.retrieval_cache.set(cache_keys[index], self.collection_name, hits)
+            results[index] = hits
+        return results
     
     def get_collection_info(self) -> dict:
         """
@@ -181,6 +405,11 @@ class QdrantService:
         except Exception:
             return False
     
+    def close(self) -> None:
+        """Close the underlying Qdrant client connection and the embedding client."""
+        self.client.close()
+        self.genai_client.close()
+    
     def delete_collection(self) -> bool:
         """
         Delete the collection.
@@ -188,11 +417,14 @@ class QdrantService:
         Returns:
             True if successful, False otherwise.
         """
+        self._collection_ready = False
         try:
             self.client.delete_collection(self.collection_name)
             return True
         except Exception:
             return False
+        finally:
+            self._invalidate_retrievals()
 
     def upload_damage_chunk(self, chunk: ChunkOutput) -> str:
         """
@@ -207,46 +439,154 @@ class QdrantService:
         Returns:
             The ID of the uploaded point.
         """
+        return self.upload_damage_chunks([chunk])[0]
+    
+    def upload_damage_chunks(self, chunks: list[ChunkOutput]) -> list[str]:
+        """
+        Upload several vehicle damage chunks to Qdrant in one upsert.
+        
+        All merged_damage_descriptions are embedded in a single batched
+        request and every point is written in one round-trip.
+        
+        Args:
+            chunks: The ChunkOutputs to upload.
+        
+        Returns:
+            The IDs of the uploaded points, in input order.
+        """
+        if not chunks:
+            return []
+        
         self._ensure_collection_exists()
         
-        # Generate embedding from merged_damage_description
-        embedding = self._generate_embedding(chunk.merged_damage_description)
+        point_ids, pending = self._plan_chunk_points(chunks)
+        pending = self._drop_existing(pending)
+        if not pending:
+            return point_ids
+        
+        # Generate embeddings from merged_damage_description
+        points = self._build_chunk_points(pending)
+        
+        # Upload to Qdrant
+        try:
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=points,
+            )
+        except Exception:
+            # The collection may have been dropped elsewhere; re-check next call
+            self._collection_ready = False
+            raise
+        finally:
+            self._invalidate_retrievals()
+        
+        return point_ids
+    
+    def bulk_upload_damage_chunks(
+        self,
+        chunks: list[ChunkOutput],
+        parallel: int = BULK_UPLOAD_PARALLEL,
+        batch_size: int = BULK_UPLOAD_BATCH_SIZE,
+    ) -> tuple[list[str], int]:
+        """
+        Ingest a large number of damage chunks with parallel uploads.
         
-        # Create payload with vehicle info and estimate as metadata
+        HNSW indexing is switched off for the duration of the load and the
+        collection's previous indexing threshold is restored afterwards, so
+        the index is built once instead of incrementally. Intended for
+        offline backfills rather than the request path, since searches on the
+        collection fall back to unindexed segments while the load runs.
+        
+        Args:
+            chunks: The ChunkOutputs to upload.
+            parallel: Number of parallel upload workers.
+            batch_size: Points sent per upload request.
+        
+        Returns:
+            The point IDs of all chunks in input order, and the number of
+            points actually written (chunks already stored are skipped).
+        """
+        if not chunks:
+            return [], 0
+        
+        created = self._ensure_collection_exists()
+        
+        point_ids, pending = self._plan_chunk_points(chunks)
+        if not created:
+            pending = self._drop_existing(pending)
+        if not pending:
+            return point_ids, 0
+        
+        points = self._build_chunk_points(pending)
+        
+        # Remember the server's effective threshold (also for a collection
+        # just created here) so the load restores exactly what was configured
+        collection = self.client.get_collection(self.collection_name)
+        # 0 is what an interrupted earlier load leaves behind, not a setting
+        indexing_threshold = collection.config.optimizer_config.indexing_threshold or None
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            optimizers_config=qdrant_models.OptimizersConfigDiff(indexing_threshold=0),
+        )
+        try:
+            self.client.upload_points(
+                collection_name=self.collection_name,
+                points=points,
+                batch_size=batch_size,
+                parallel=parallel,
+                wait=True,
+            )
+        finally:
+            self.finalize_bulk_load(indexing_threshold)
+            self._invalidate_retrievals()
+        
+        return point_ids, len(pending)
+    
+    def _invalidate_retrievals(self) -> None:
+        """Drop cached search results after a write to the collection."""
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.invalidate(self.collection_name)
+    
+    def _plan_chunk_points(self, chunks: list[ChunkOutput]) -> tuple[list[str], list[tuple[str, ChunkOutput]]]:
+        """
+        Assign every chunk its deterministic point ID.
+        
+        Returns:
+            The point IDs in input order, and the distinct (point_id, chunk)
+            pairs that still need to be written.
+        """
+        point_ids = [_chunk_point_id(chunk) for chunk in chunks]
+        pending = list(dict(zip(point_ids, chunks)).items())
+        return point_ids, pending
+    
+    def _drop_existing(self, pending: list[tuple[str, ChunkOutput]]) -> list[tuple[str, ChunkOutput]]:
+        """Filter out chunks whose point is already stored, so they are neither embedded nor upserted."""
+        existing_ids: set[str] = set()
+        for start in range(0, len(pending), self.BULK_UPLOAD_BATCH_SIZE):
+            existing = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=[point_id for point_id, _ in pending[start:start + self.BULK_UPLOAD_BATCH_SIZE]],
+                with_payload=False,
+                with_vectors=False,
+            )
+            existing_ids.update(str(record.id) for record in existing)
+        return [(point_id, chunk) for point_id, chunk in pending if point_id not in existing_ids]
+    
+    def _build_chunk_points(self, pending: list[tuple[str, ChunkOutput]]) -> list[qdrant_models.PointStruct]:
+        """Embed the merged_damage_descriptions and build one Qdrant point per chunk."""
+        embeddings = self._generate_embeddings([chunk.merged_damage_description for _, chunk in pending])
+        return [
+            self._build_chunk_point(point_id, chunk, embedding)
+            for (point_id, chunk), embedding in zip(pending, embeddings)
+        ]
+    
+    def _build_chunk_point(self, point_id: str, chunk: ChunkOutput, embedding: np.ndarray) -> qdrant_models.PointStruct:
+        """Build the Qdrant point for a damage chunk."""
+        # Create payload with vehicle info and estimate as metadata, dumped in
+        # one pydantic-core call instead of rebuilding every nested dict here
         payload = {
             "content": chunk.merged_damage_description,
-            "vehicle_info": {
-                "vin": chunk.vehicle_info.vin,
-                "make": chunk.vehicle_info.make,
-                "model": chunk.vehicle_info.model,
-                "year": chunk.vehicle_info.year,
-                "body_type": chunk.vehicle_info.body_type,
-            },
-            "side": chunk.side,
-            "images": chunk.images,
-            "damage_descriptions": [
-                {
-                    "location": d.location,
-                    "part": d.part,
-                    "severity": d.severity,
-                    "type": d.type,
-                    "start_position": d.start_position,
-                    "end_position": d.end_position,
-                    "description": d.description,
-                }
-                for d in chunk.damage_descriptions
-            ],
-            "approved_estimate": {
-                category: [
-                    {
-                        "Description": op.Description,
-                        "Operation": op.Operation,
-                        **({"LabourHours": op.LabourHours} if op.LabourHours is not None else {}),
-                    }
-                    for op in operations
-                ]
-                for category, operations in chunk.approved_estimate.items()
-            },
+            **chunk.model_dump(include=_CHUNK_PAYLOAD_FIELDS),
             "uploaded_at": datetime.now().isoformat(),
         }
         
@@ -258,20 +598,8 @@ class QdrantService:
         if chunk.account_id is not None:
             payload["account_id"] = chunk.account_id
         
-        # Generate a numeric ID from VIN + side + timestamp
-        unique_id = f"{chunk.vehicle_info.vin}_{chunk.side}_{datetime.now().isoformat()}"
-        point_id = int(hashlib.md5(unique_id.encode()).hexdigest()[:16], 16)
-        
-        # Upload to Qdrant
-        self.client.upsert(
-            collection_name=self.collection_name,
-            points=[
-                qdrant_models.PointStruct(
-                    id=point_id,
-                    vector=embedding,
-                    payload=payload,
-                )
-            ],
+        return qdrant_models.PointStruct(
+            id=point_id,
+            vector=embedding.tolist(),
+            payload=payload,
         )
-        
-        return unique_id
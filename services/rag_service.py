@@ -1,16 +1,23 @@
 """Service for RAG (Retrieval Augmented Generation) pipeline."""
 
-import base64
+import hashlib
+import logging
+import threading
 import time
+from bisect import bisect_left
+from collections import Counter, OrderedDict, defaultdict
+from functools import lru_cache
 from typing import Optional, Literal
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 
+import httpx
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.messages import HumanMessage
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from config import settings
-from models.vehicle_damage import VehicleInfo, DamageDescription
+from models.vehicle_damage import VehicleInfo, DamageDescription, DAMAGE_LIST_ADAPTER
 from models.rag_models import (
     DamageDetectionResult,
     RetrievedChunk,
@@ -21,9 +28,11 @@ from models.rag_models import (
 )
 from prompts.rag_prompts import (
     get_damage_detection_prompt,
-    get_damage_detection_with_context_prompt,
+    get_damage_detection_prompt_for_vehicle,
+    get_multi_image_detection_prompt,
     get_estimate_generation_prompt,
 )
+from services.image_cache import ImageCache
 from services.s3_service import S3Service
 from services.qdrant_service import QdrantService
 
@@ -34,8 +43,74 @@ os.environ['LANGSMITH_ENDPOINT'] = 'https://api.smith.langchain.com'
 os.environ['LANGSMITH_API_KEY'] = settings.langsmith_api_key
 os.environ['LANGSMITH_PROJECT'] = settings.langsmith_project or 'default'
 
+logger = logging.getLogger(__name__)
 
-class DamageDetectionOutput(BaseModel):
+
+# Downloaded images kept per service instance, so re-analyzing a claim's bucket
+# skips the S3 fetch; entries expire after settings.image_cache_ttl
+IMAGE_CACHE_SIZE = 64
+# Detection results kept per service instance, keyed by image content plus the
+# prompt inputs, so identical images (under any URL) skip the Gemini call
+DETECTION_CACHE_SIZE = 1024
+
+# Merged description for a detection batch without damage; a pipeline request
+# carrying only this has nothing to estimate
+NO_DAMAGE_DESCRIPTION = "No visible damage detected."
+
+# Severities from least to most severe; anything unrecognized counts as Minor
+SEVERITY_LEVELS = ("Minor", "Medium", "Major")
+SEVERITY_RANK = {severity: rank for rank, severity in enumerate(SEVERITY_LEVELS)}
+
+# Threads in the shared batch-detection pool; each batch still caps its own
+# share with max_workers
+DETECTION_MAX_WORKERS = 32
+
+# Idle HTTPS connections to Gemini kept open: one per detection thread, held
+# long enough to span the gap between requests
+GEMINI_HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=DETECTION_MAX_WORKERS,
+    keepalive_expiry=120,
+)
+
+# Payload keys read into RetrievedChunk; images, IDs and timestamps stay in Qdrant
+RETRIEVAL_PAYLOAD_FIELDS = ["content", "vehicle_info", "side", "damage_descriptions", "approved_estimate"]
+
+# Per-part retrieval queries sent next to the merged one, so damage spread over
+# several parts is matched part by part; all go out in one Qdrant batch
+MAX_PART_QUERIES = 8
+
+
+def _prune_schema(schema: dict) -> None:
+    """
+    Drop the generated titles and the class docstring from a model's JSON schema.
+    
+    Gemini bills the response schema as input tokens on every call, and
+    neither carries information the field descriptions don't.
+    """
+    schema.pop("title", None)
+    schema.pop("description", None)
+    for prop in schema.get("properties", {}).values():
+        prop.pop("title", None)
+
+
+class GeminiOutput(BaseModel):
+    """Base for Gemini structured-output schemas."""
+    model_config = ConfigDict(json_schema_extra=_prune_schema)
+
+
+class DetectedDamageOutput(GeminiOutput):
+    """Single damage in the detection output."""
+    location: str = Field(description="Location on the vehicle")
+    part: str = Field(description="Affected part name")
+    severity: Literal["Minor", "Medium", "Major"] = Field(description="Damage severity")
+    type: str = Field(description="Type of damage")
+    start_position: str = Field(description="Starting position of damage")
+    end_position: str = Field(description="Ending position of damage")
+    description: str = Field(description="Detailed description of the damage")
+
+
+class DamageDetectionOutput(GeminiOutput):
     """Structured output for damage detection."""
     side: Literal[
         "front", "rear", "left", "right", "roof", "unknown",
@@ -49,13 +124,28 @@ class DamageDetectionOutput(BaseModel):
     confidence: float = Field(
         description="Confidence score for the detection (0-1)"
     )
-    damages: list[dict] = Field(
+    damages: list[DetectedDamageOutput] = Field(
+        default_factory=list,
+        description="List of detected damages"
+    )
+
+
+class IndexedDamageDetectionOutput(DamageDetectionOutput):
+    """Detection for one image of a multi-image request."""
+    image_index: int = Field(
+        description="Label number of the image this detection describes"
+    )
+
+
+class MultiImageDetectionOutput(GeminiOutput):
+    """Structured output for damage detection over several images."""
+    detections: list[IndexedDamageDetectionOutput] = Field(
         default_factory=list,
-        description="List of detected damages with location, part, severity, type, start_position, end_position, description"
+        description="One detection per input image"
     )
 
 
-class EstimateOperationOutput(BaseModel):
+class EstimateOperationOutput(GeminiOutput):
     """Single operation in the estimate output."""
     Description: str = Field(description="Part or operation description")
     Operation: str = Field(description="Type of operation")
@@ -63,14 +153,54 @@ class EstimateOperationOutput(BaseModel):
     PartId: Optional[str] = Field(default=None, description="ID of the part from PSS data that needs to be replaced or repaired")
 
 
-class EstimateOutput(BaseModel):
+class EstimateOutput(GeminiOutput):
     """Structured output for estimate generation in approved_estimate format."""
-    estimate: dict[str, list[dict]] = Field(
+    estimate: dict[str, list[EstimateOperationOutput]] = Field(
         default_factory=dict,
-        description="Estimate operations grouped by part category. Each key is a part category (e.g., 'Rear Bumper'), and each value is a list of operations with Description, Operation, optionally LaborHours, and PartId (ID from PSS data)."
+        description="Estimate operations grouped by part category (e.g., 'Rear Bumper')"
     )
 
 
+def _iter_pss_part_details(pss_data: dict):
+    """Yield every PartDetails entry across the PSS category tree."""
+    for category in pss_data.get("Categories", ()):
+        for subcategory in category.get("SubCategories", ()):
+            for part in subcategory.get("Parts", ()):
+                yield from part.get("PartDetails", ())
+
+
+@lru_cache(maxsize=256)
+def _merged_damage_narrative(
+    damages: tuple[tuple[str, str, str], ...],
+    vehicle_info: Optional[VehicleInfo],
+) -> str:
+    """Narrative behind _merge_damage_descriptions, memoized on (part, severity, type) triples."""
+    # One pass: highest severity rank and damage types seen for each part,
+    # in first-seen part order
+    damages_by_part: dict[str, list] = {}
+    for part, severity, damage_type in damages:
+        entry = damages_by_part.get(part)
+        if entry is None:
+            entry = damages_by_part[part] = [0, set()]
+        rank = SEVERITY_RANK.get(severity, 0)
+        if rank > entry[0]:
+            entry[0] = rank
+        entry[1].add(damage_type)
+    
+    # Build narrative
+    parts = "; ".join(
+        f"{part} ({SEVERITY_LEVELS[rank]} {', '.join(types)})"
+        for part, (rank, types) in damages_by_part.items()
+    )
+    
+    if vehicle_info:
+        vehicle_str = f"The {vehicle_info.year} {vehicle_info.make} {vehicle_info.model} shows "
+    else:
+        vehicle_str = "The vehicle shows "
+    
+    return vehicle_str + "damage to: " + parts + "."
+
+
 class RAGService:
     """Service for RAG-based damage estimation pipeline."""
     
@@ -85,6 +215,7 @@ class RAGService:
             api_key=settings.gemini_api_key,
             temperature=1.0,
             media_resolution="MEDIA_RESOLUTION_HIGH",
+            client_args={"limits": GEMINI_HTTP_LIMITS},
         )
         
         # Structured output models
@@ -92,6 +223,10 @@ class RAGService:
             schema=DamageDetectionOutput,
             method="json_schema",
         )
+        self.multi_damage_detection_model = self.model.with_structured_output(
+            schema=MultiImageDetectionOutput,
+            method="json_schema",
+        )
         self.estimate_model = self.model.with_structured_output(
             schema=EstimateOutput,
             method="json_schema",
@@ -100,10 +235,55 @@ class RAGService:
         # Initialize services
         self.s3_service = S3Service()
         self.qdrant_service = QdrantService()
+        
+        # Worker threads for batch detection, shared by every request instead
+        # of starting a new pool per batch
+        self._executor = ThreadPoolExecutor(
+            max_workers=DETECTION_MAX_WORKERS,
+            thread_name_prefix="rag-detect",
+        )
+        
+        self._image_cache: ImageCache[tuple[bytes, str]] = ImageCache(IMAGE_CACHE_SIZE, settings.image_cache_ttl)
+        self._detection_cache: OrderedDict[tuple, DamageDetectionResult] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Open the first Gemini connection in the background, so the first
+        # detection doesn't pay for the TLS handshake
+        threading.Thread(target=self.warm_up, name="rag-warm-up", daemon=True).start()
+    
+    def warm_up(self) -> None:
+        """Open a pooled connection to Gemini with a metadata call that uses no tokens."""
+        try:
+            self.model.client.models.get(model=settings.gemini_model)
+        except Exception as e:
+            logger.warning("Gemini warm-up failed: %s", e)
+    
+    def close(self) -> None:
+        """Stop the detection pool and close the Qdrant client."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.qdrant_service.close()
+    
+    def get_image(self, s3_url: str) -> tuple[bytes, str]:
+        """
+        Download an image from S3, reusing earlier fetches.
+        
+        Args:
+            s3_url: S3 URL of the image
+        
+        Returns:
+            Tuple of (image_bytes, mime_type)
+        """
+        cached = self._image_cache.get(s3_url)
+        if cached is not None:
+            return cached
+        
+        image = self.s3_service.get_image(s3_url)
+        self._image_cache.set(s3_url, image)
+        return image
     
     def detect_damage_single_image(
         self,
-        image_data: bytes,
+        image_data: bytes | str,
         mime_type: str,
         s3_url: str,
         vehicle_info: Optional[VehicleInfo] = None,
@@ -113,7 +293,7 @@ class RAGService:
         Detect damage in a single image.
         
         Args:
-            image_data: Raw image bytes
+            image_data: Raw image bytes, or the image already base64-encoded
             mime_type: MIME type of the image
             s3_url: S3 URL of the image
             vehicle_info: Optional vehicle information for context
@@ -122,69 +302,216 @@ class RAGService:
         Returns:
             DamageDetectionResult with detected damages
         """
-        # Get appropriate prompt
-        if vehicle_info:
-            prompt = get_damage_detection_with_context_prompt(
-                year=vehicle_info.year,
-                make=vehicle_info.make,
-                model=vehicle_info.model,
-                body_type=vehicle_info.body_type,
-                human_description=human_description,
-            )
-        else:
-            prompt = get_damage_detection_prompt()
+        cache_key, cached, message = self._prepare_detection(
+            image_data, mime_type, vehicle_info, human_description
+        )
+        if cached is not None:
+            return cached.model_copy(update={"image_url": s3_url}, deep=True)
         
-        # Encode image
-        image_base64 = base64.b64encode(image_data).decode('utf-8')
+        # Get detection result
+        result: DamageDetectionOutput = self.damage_detection_model.invoke([message])
+        return self._finish_detection(cache_key, s3_url, result)
+    
+    def _prepare_detection(
+        self,
+        image_data: bytes | str,
+        mime_type: str,
+        vehicle_info: Optional[VehicleInfo],
+        human_description: Optional[str],
+    ) -> tuple[tuple, Optional[DamageDetectionResult], Optional[HumanMessage]]:
+        """
+        Build the detection cache key and either the cached result or the Gemini message.
+        
+        Returns:
+            Tuple of (cache_key, cached result or None, message or None)
+        """
+        cache_key = self._detection_cache_key(image_data, mime_type, vehicle_info, human_description)
+        cached = self._cached_detection(cache_key)
+        if cached is not None:
+            return cache_key, cached, None
         
-        # Create message with image
+        prompt = self._detection_prompt(vehicle_info, human_description)
+        
+        # Create message with image. Raw bytes go straight into the Gemini
+        # inline-data part; base64 text is decoded by the integration first
         message = HumanMessage(
             content=[
                 {"type": "text", "text": prompt},
                 {
-                    "type": "image",
-                    "base64": image_base64,
+                    "type": "media",
+                    "data": image_data,
                     "mime_type": mime_type,
                 },
             ]
         )
+        return cache_key, None, message
+    
+    @staticmethod
+    def _detection_cache_key(
+        image_data: bytes | str,
+        mime_type: str,
+        vehicle_info: Optional[VehicleInfo],
+        human_description: Optional[str],
+    ) -> tuple:
+        """Same pixels and same prompt inputs map to the same cached detection."""
+        return (
+            hashlib.sha256(image_data if isinstance(image_data, bytes) else image_data.encode()).digest(),
+            mime_type,
+            vehicle_info,
+            human_description,
+        )
+    
+    def _cached_detection(self, cache_key: tuple) -> Optional[DamageDetectionResult]:
+        """Return the cached detection for ``cache_key``, or None on a miss."""
+        with self._cache_lock:
+            cached = self._detection_cache.get(cache_key)
+            if cached is not None:
+                self._detection_cache.move_to_end(cache_key)
+            return cached
+    
+    @staticmethod
+    def _detection_prompt(
+        vehicle_info: Optional[VehicleInfo],
+        human_description: Optional[str],
+    ) -> str:
+        """Get the appropriate single-image detection prompt."""
+        if vehicle_info:
+            return get_damage_detection_prompt_for_vehicle(vehicle_info, human_description)
+        return get_damage_detection_prompt()
+    
+    def detect_damage_multi_image(
+        self,
+        images: list[tuple[bytes | str, str, str]],
+        vehicle_info: Optional[VehicleInfo] = None,
+        human_description: Optional[str] = None,
+    ) -> list[DamageDetectionResult]:
+        """
+        Detect damage in several images with one Gemini call.
         
-        # Get detection result
-        result: DamageDetectionOutput = self.damage_detection_model.invoke([message])
+        The prompt and schema are sent once for the whole group instead of once
+        per image. Images the model skips or mislabels are retried one by one.
         
-        # Convert damages to DamageDescription objects
-        damages = []
-        for damage_dict in result.damages:
-            try:
-                damages.append(DamageDescription(
-                    location=damage_dict.get('location', 'Unknown'),
-                    part=damage_dict.get('part', 'Unknown'),
-                    severity=damage_dict.get('severity', 'Unknown'),
-                    type=damage_dict.get('type', 'Unknown'),
-                    start_position=damage_dict.get('start_position', 'N/A'),
-                    end_position=damage_dict.get('end_position', 'N/A'),
-                    description=damage_dict.get('description', ''),
-                ))
-            except Exception as e:
-                print(f"Warning: Could not parse damage: {e}")
+        Args:
+            images: List of (image_data, mime_type, s3_url) tuples
+            vehicle_info: Optional vehicle information for context
+            human_description: Optional human-provided damage description
         
-        return DamageDetectionResult(
+        Returns:
+            One DamageDetectionResult per input image, in input order
+        """
+        results, cache_keys, message = self._prepare_multi_detection(
+            images, vehicle_info, human_description
+        )
+        if message is not None:
+            output: MultiImageDetectionOutput = self.multi_damage_detection_model.invoke([message])
+            self._finish_multi_detection(images, results, cache_keys, output)
+        
+        for index, result in enumerate(results):
+            if result is None:
+                image_data, mime_type, s3_url = images[index]
+                results[index] = self.detect_damage_single_image(
+                    image_data, mime_type, s3_url, vehicle_info, human_description
+                )
+        return results
+    
+    def _prepare_multi_detection(
+        self,
+        images: list[tuple[bytes | str, str, str]],
+        vehicle_info: Optional[VehicleInfo],
+        human_description: Optional[str],
+    ) -> tuple[list[Optional[DamageDetectionResult]], list[tuple], Optional[HumanMessage]]:
+        """
+        Resolve cached images and build one labelled message for the rest.
+        
+        Returns:
+            Tuple of (results with None for uncached images, cache keys, message or None).
+            No message is built when fewer than two images are uncached; those
+            go through the single-image path instead.
+        """
+        results: list[Optional[DamageDetectionResult]] = []
+        cache_keys = []
+        pending = []
+        for index, (image_data, mime_type, s3_url) in enumerate(images):
+            cache_key = self._detection_cache_key(image_data, mime_type, vehicle_info, human_description)
+            cached = self._cached_detection(cache_key)
+            cache_keys.append(cache_key)
+            results.append(cached.model_copy(update={"image_url": s3_url}, deep=True) if cached is not None else None)
+            if cached is None:
+                pending.append(index)
+        
+        if len(pending) < 2:
+            return results, cache_keys, None
+        
+        # Labels are positions within this request; _finish_multi_detection maps them back
+        prompt = get_multi_image_detection_prompt(
+            self._detection_prompt(vehicle_info, human_description), len(pending)
+        )
+        content = [{"type": "text", "text": prompt}]
+        for label, index in enumerate(pending):
+            image_data, mime_type, _ = images[index]
+            content.append({"type": "text", "text": f"Image {label}"})
+            content.append({"type": "media", "data": image_data, "mime_type": mime_type})
+        return results, cache_keys, HumanMessage(content=content)
+    
+    def _finish_multi_detection(
+        self,
+        images: list[tuple[bytes | str, str, str]],
+        results: list[Optional[DamageDetectionResult]],
+        cache_keys: list[tuple],
+        output: MultiImageDetectionOutput,
+    ) -> None:
+        """Fill ``results`` in place from the labelled detections Gemini returned."""
+        pending = [index for index, result in enumerate(results) if result is None]
+        for detection in output.detections:
+            if not 0 <= detection.image_index < len(pending):
+                continue
+            index = pending[detection.image_index]
+            if results[index] is None:
+                results[index] = self._finish_detection(cache_keys[index], images[index][2], detection)
+    
+    def _finish_detection(
+        self,
+        cache_key: tuple,
+        s3_url: str,
+        result: DamageDetectionOutput,
+    ) -> DamageDetectionResult:
+        """Turn Gemini's structured output into a DamageDetectionResult and cache it."""
+        # Convert damages to DamageDescription objects, validating the whole
+        # list in one call; the schema already guarantees every field
+        damages = DAMAGE_LIST_ADAPTER.validate_python(result.damages, from_attributes=True)
+        
+        detection = DamageDetectionResult(
             image_url=s3_url,
             has_damage=result.has_damage,
             side=result.side,
             damages=damages,
             confidence=result.confidence,
         )
+        
+        with self._cache_lock:
+            self._detection_cache[cache_key] = detection
+            if len(self._detection_cache) > DETECTION_CACHE_SIZE:
+                self._detection_cache.popitem(last=False)
+        return detection.model_copy(deep=True)
+    
+    def _fetch_image_worker(self, s3_url: str) -> tuple[str, Optional[tuple[bytes, str]]]:
+        """Worker function downloading one image; None in place of the image on failure."""
+        try:
+            return s3_url, self.get_image(s3_url)
+        except Exception as e:
+            logger.warning("Error detecting damage in %s: %s", s3_url, e)
+            return s3_url, None
     
-    def _detect_damage_worker(
+    def _detect_fetched_worker(
         self,
         s3_url: str,
+        image: tuple[bytes, str],
         vehicle_info: Optional[VehicleInfo] = None,
         human_description: Optional[str] = None,
     ) -> DamageDetectionResult:
-        """Worker function for parallel damage detection."""
+        """Worker function for parallel damage detection on an already downloaded image."""
         try:
-            image_data, mime_type = self.s3_service.get_image(s3_url)
+            image_data, mime_type = image
             return self.detect_damage_single_image(
                 image_data=image_data,
                 mime_type=mime_type,
@@ -193,14 +520,64 @@ class RAGService:
                 human_description=human_description,
             )
         except Exception as e:
-            print(f"Error detecting damage in {s3_url}: {e}")
-            return DamageDetectionResult(
-                image_url=s3_url,
-                has_damage=False,
-                side="unknown",
-                damages=[],
-                confidence=0.0,
-            )
+            logger.warning("Error detecting damage in %s: %s", s3_url, e)
+            return self._failed_detection(s3_url)
+    
+    def _detect_damage_pipelined(
+        self,
+        image_urls: list[str],
+        vehicle_info: Optional[VehicleInfo],
+        human_description: Optional[str],
+        max_workers: int,
+    ) -> list[DamageDetectionResult]:
+        """
+        Download and analyze images as two overlapping stages on the shared pool.
+        
+        Up to ``max_workers`` downloads and ``max_workers`` Gemini calls run at
+        once, and each call starts as soon as its image arrives, so S3 latency
+        overlaps earlier images' Gemini latency instead of adding to it.
+        """
+        detections: list[DamageDetectionResult] = []
+        calls = set()
+        for s3_url, image in self._map_bounded(self._fetch_image_worker, image_urls, max_workers):
+            if image is None:
+                detections.append(self._failed_detection(s3_url))
+                continue
+            if len(calls) >= max_workers:
+                done, calls = wait(calls, return_when=FIRST_COMPLETED)
+                detections.extend(future.result() for future in done)
+            calls.add(self._executor.submit(
+                self._detect_fetched_worker, s3_url, image, vehicle_info, human_description
+            ))
+        
+        done, _ = wait(calls)
+        detections.extend(future.result() for future in done)
+        return detections
+    
+    def _detect_damage_group_worker(
+        self,
+        s3_urls: list[str],
+        vehicle_info: Optional[VehicleInfo] = None,
+        human_description: Optional[str] = None,
+    ) -> list[DamageDetectionResult]:
+        """Worker function detecting damage in a group of images with one Gemini call."""
+        try:
+            images = [(*self.get_image(s3_url), s3_url) for s3_url in s3_urls]
+            return self.detect_damage_multi_image(images, vehicle_info, human_description)
+        except Exception as e:
+            logger.warning("Error detecting damage in %s: %s", ", ".join(s3_urls), e)
+            return [self._failed_detection(s3_url) for s3_url in s3_urls]
+    
+    @staticmethod
+    def _failed_detection(s3_url: str) -> DamageDetectionResult:
+        """Placeholder result for an image whose detection failed."""
+        return DamageDetectionResult(
+            image_url=s3_url,
+            has_damage=False,
+            side="unknown",
+            damages=[],
+            confidence=0.0,
+        )
     
     def detect_damage_batch(
         self,
@@ -209,6 +586,7 @@ class RAGService:
         vehicle_info: Optional[VehicleInfo] = None,
         human_description: Optional[str] = None,
         max_workers: int = 10,
+        images_per_request: int = 1,
     ) -> DamageDetectionResponse:
         """
         Detect damage in multiple images.
@@ -219,6 +597,8 @@ class RAGService:
             vehicle_info: Optional vehicle information
             human_description: Optional human-provided description
             max_workers: Maximum parallel workers
+            images_per_request: Images sent together in one Gemini call
+                (4-6 amortizes the prompt; 1 keeps one call per image)
         
         Returns:
             DamageDetectionResponse with all detection results
@@ -245,41 +625,23 @@ class RAGService:
                     processing_time_seconds=time.time() - start_time,
                 )
             
-            # Detect damage in parallel
+            # Detect damage in parallel on the shared pool
             detections: list[DamageDetectionResult] = []
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {
-                    executor.submit(
-                        self._detect_damage_worker,
-                        s3_url,
-                        vehicle_info,
-                        human_description,
-                    ): s3_url
-                    for s3_url in all_image_urls
-                }
-                
-                for future in as_completed(futures):
-                    result = future.result()
-                    detections.append(result)
-            
-            # Count images with damage
-            images_with_damage = sum(1 for d in detections if d.has_damage)
-            
-            # Create merged description
-            all_damages = []
-            for detection in detections:
-                all_damages.extend(detection.damages)
+            if images_per_request > 1:
+                for results in self._map_bounded(
+                    self._detect_damage_group_worker,
+                    self._group_urls(all_image_urls, images_per_request),
+                    max_workers,
+                    vehicle_info,
+                    human_description,
+                ):
+                    detections.extend(results)
+            else:
+                detections = self._detect_damage_pipelined(
+                    all_image_urls, vehicle_info, human_description, max_workers
+                )
             
-            merged_description = self._merge_damage_descriptions(all_damages, vehicle_info)
-            
-            return DamageDetectionResponse(
-                success=True,
-                total_images=len(all_image_urls),
-                images_with_damage=images_with_damage,
-                detections=detections,
-                merged_damage_description=merged_description,
-                processing_time_seconds=time.time() - start_time,
-            )
+            return self._detection_response(all_image_urls, detections, vehicle_info, start_time)
             
         except Exception as e:
             return DamageDetectionResponse(
@@ -288,6 +650,55 @@ class RAGService:
                 processing_time_seconds=time.time() - start_time,
             )
     
+    def _map_bounded(self, fn, items, max_workers: int, *args):
+        """
+        Run ``fn(item, *args)`` for every item on the shared executor.
+        
+        At most ``max_workers`` calls from this batch are queued at once, so
+        one large batch cannot occupy the whole pool; results are yielded in
+        completion order.
+        """
+        items = iter(items)
+        pending = {self._executor.submit(fn, item, *args) for item in islice(items, max_workers)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for item in islice(items, len(done)):
+                pending.add(self._executor.submit(fn, item, *args))
+            for future in done:
+                yield future.result()
+    
+    @staticmethod
+    def _group_urls(image_urls: list[str], size: int) -> list[list[str]]:
+        """Split image URLs into consecutive groups of at most ``size``."""
+        return [image_urls[i:i + size] for i in range(0, len(image_urls), size)]
+    
+    def _detection_response(
+        self,
+        all_image_urls: list[str],
+        detections: list[DamageDetectionResult],
+        vehicle_info: Optional[VehicleInfo],
+        start_time: float,
+    ) -> DamageDetectionResponse:
+        """Summarize a batch of detections into a DamageDetectionResponse."""
+        # Count images with damage
+        images_with_damage = sum(1 for d in detections if d.has_damage)
+        
+        # Create merged description
+        all_damages = []
+        for detection in detections:
+            all_damages.extend(detection.damages)
+        
+        merged_description = self._merge_damage_descriptions(all_damages, vehicle_info)
+        
+        return DamageDetectionResponse(
+            success=True,
+            total_images=len(all_image_urls),
+            images_with_damage=images_with_damage,
+            detections=detections,
+            merged_damage_description=merged_description,
+            processing_time_seconds=time.time() - start_time,
+        )
+    
     def _merge_damage_descriptions(
         self,
         damages: list[DamageDescription],
@@ -295,31 +706,33 @@ class RAGService:
     ) -> str:
         """Create a merged narrative from all damage descriptions."""
         if not damages:
-            return "No visible damage detected."
-        
-        # Group damages by part
-        damages_by_part = {}
-        for damage in damages:
-            part = damage.part
-            if part not in damages_by_part:
-                damages_by_part[part] = []
-            damages_by_part[part].append(damage)
-        
-        # Build narrative
-        parts = []
-        for part, part_damages in damages_by_part.items():
-            severities = [d.severity for d in part_damages]
-            types = list(set(d.type for d in part_damages))
-            max_severity = "Major" if "Major" in severities else ("Medium" if "Medium" in severities else "Minor")
-            parts.append(f"{part} ({max_severity} {', '.join(types)})")
-        
-        vehicle_str = ""
-        if vehicle_info:
-            vehicle_str = f"The {vehicle_info.year} {vehicle_info.make} {vehicle_info.model} shows "
-        else:
-            vehicle_str = "The vehicle shows "
+            return NO_DAMAGE_DESCRIPTION
         
-        return vehicle_str + "damage to: " + "; ".join(parts) + "."
+        return _merged_damage_narrative(
+            tuple((d.part, d.severity, d.type) for d in damages),
+            vehicle_info,
+        )
+    
+    def _part_queries(
+        self,
+        damages: list[DamageDescription],
+        vehicle_info: Optional[VehicleInfo] = None,
+    ) -> list[str]:
+        """
+        Build one retrieval query per damaged part, in first-seen part order.
+        
+        Each query is the merged narrative restricted to that part. A single
+        damaged part yields no queries, since the merged query already is one.
+        """
+        damages_by_part: dict[str, list[tuple[str, str, str]]] = {}
+        for d in damages:
+            damages_by_part.setdefault(d.part, []).append((d.part, d.severity, d.type))
+        if len(damages_by_part) < 2:
+            return []
+        return [
+            _merged_damage_narrative(tuple(part_damages), vehicle_info)
+            for part_damages in islice(damages_by_part.values(), MAX_PART_QUERIES)
+        ]
     
     def _extract_pss_parts(self, pss_data: Optional[dict]) -> dict[str, dict]:
         """
@@ -334,49 +747,59 @@ class RAGService:
         parts_map = {}
         
         try:
-            categories = pss_data.get("Categories", [])
-            for category in categories:
-                subcategories = category.get("SubCategories", [])
-                for subcategory in subcategories:
-                    parts = subcategory.get("Parts", [])
-                    for part in parts:
-                        part_details = part.get("PartDetails", [])
-                        for detail in part_details:
-                            # Use FullDescription as primary key
-                            full_desc = detail.get("FullDescription", "")
-                            part_id = detail.get("Id", "")
-                            
-                            if full_desc and part_id:
-                                parts_map[full_desc.lower()] = {
-                                    "id": str(part_id),
-                                    "full_description": full_desc,
-                                    "description": detail.get("Part", {}).get("Description", ""),
-                                    "available_operations": detail.get("AvailableOperations", []),
-                                }
-                            
-                            # Also map by Part Description for flexibility
-                            part_desc = detail.get("Part", {}).get("Description", "")
-                            if part_desc and part_id and part_desc.lower() not in parts_map:
-                                parts_map[part_desc.lower()] = {
-                                    "id": str(part_id),
-                                    "full_description": full_desc,
-                                    "description": part_desc,
-                                    "available_operations": detail.get("AvailableOperations", []),
-                                }
+            for detail in _iter_pss_part_details(pss_data):
+                part_id = detail.get("Id", "")
+                if not part_id:
+                    continue
+                full_desc = detail.get("FullDescription", "")
+                part_desc = detail.get("Part", {}).get("Description", "")
+                # Both keys describe the same detail, so they share one entry
+                info = {
+                    "id": str(part_id),
+                    "full_description": full_desc,
+                    "description": part_desc,
+                    "available_operations": detail.get("AvailableOperations", []),
+                }
+                
+                # Use FullDescription as primary key
+                if full_desc:
+                    parts_map[full_desc.lower()] = info
+                
+                # Also map by Part Description for flexibility
+                if part_desc:
+                    parts_map.setdefault(part_desc.lower(), info)
         except Exception as e:
-            print(f"Warning: Error extracting PSS parts: {e}")
+            logger.warning("Error extracting PSS parts: %s", e)
         
         return parts_map
     
+    def _index_pss_parts(self, pss_parts_map: dict[str, dict]) -> tuple[list[str], dict[str, list[int]]]:
+        """
+        Build a token index over the PSS part descriptions for _match_part_with_pss.
+        
+        Returns:
+            Tuple of (descriptions in map order, token -> positions of the
+            descriptions containing it)
+        """
+        descriptions = list(pss_parts_map)
+        token_positions: dict[str, list[int]] = defaultdict(list)
+        for position, pss_desc in enumerate(descriptions):
+            for token in set(pss_desc.split()):
+                token_positions[token].append(position)
+        return descriptions, token_positions
+    
     def _match_part_with_pss(
         self,
         part_description: str,
         pss_parts_map: dict[str, dict],
+        pss_index: Optional[tuple[list[str], dict[str, list[int]]]] = None,
     ) -> Optional[str]:
         """
         Match a part description with PSS data and return the PartId.
         
-        Uses fuzzy matching to find the best match.
+        Uses fuzzy matching to find the best match. Pass the result of
+        _index_pss_parts as ``pss_index`` when matching many descriptions
+        against the same map.
         """
         if not part_description or not pss_parts_map:
             return None
@@ -387,25 +810,40 @@ class RAGService:
         if part_lower in pss_parts_map:
             return pss_parts_map[part_lower]["id"]
         
-        # Partial match - check if description contains key terms
-        for pss_desc, part_info in pss_parts_map.items():
-            # Check if part description contains key words from PSS part
-            pss_words = set(pss_desc.split())
-            desc_words = set(part_lower.split())
-            
-            # If significant overlap, consider it a match
-            if len(pss_words.intersection(desc_words)) >= 2:
-                return part_info["id"]
-            
-            # Check if PSS description contains the part description or vice versa
+        descriptions, token_positions = pss_index or self._index_pss_parts(pss_parts_map)
+        
+        # Earliest PSS part sharing at least two words with the description;
+        # a one-word description can only match by substring
+        first_overlap = len(descriptions)
+        words = set(part_lower.split())
+        postings = [token_positions[word] for word in words if word in token_positions]
+        if len(postings) >= 2:
+            # Count over growing prefixes of the (sorted) posting lists, so a
+            # match near the start of the map never touches the long tails
+            limit = 64
+            while True:
+                overlaps = Counter()
+                for positions in postings:
+                    overlaps.update(positions[:bisect_left(positions, limit)])
+                matches = [position for position, count in overlaps.items() if count >= 2]
+                if matches or limit >= len(descriptions):
+                    first_overlap = min(matches, default=first_overlap)
+                    break
+                limit *= 8
+        
+        # An earlier part may still match by substring; the first match in
+        # map order wins, as with a linear scan
+        for pss_desc in descriptions[:first_overlap]:
             if part_lower in pss_desc or pss_desc in part_lower:
-                return part_info["id"]
+                return pss_parts_map[pss_desc]["id"]
         
+        if first_overlap < len(descriptions):
+            return pss_parts_map[descriptions[first_overlap]]["id"]
         return None
     
     def retrieve_similar_chunks(
         self,
-        damage_description: str,
+        damage_description: str | list[str],
         top_k: int = 5,
         score_threshold: Optional[float] = 0.5,
     ) -> list[RetrievedChunk]:
@@ -413,24 +851,40 @@ class RAGService:
         Retrieve similar damage chunks from Qdrant.
         
         Args:
-            damage_description: The damage description to search for
+            damage_description: The damage description to search for, or several
+                (e.g. one per damaged side) searched in a single Qdrant request
             top_k: Number of results to retrieve
             score_threshold: Minimum similarity score
         
         Returns:
-            List of RetrievedChunk objects
+            List of RetrievedChunk objects; for several descriptions, the best
+            top_k distinct chunks across all of them
         """
         if not self.qdrant_service.is_connected():
-            print("Warning: Qdrant is not connected")
+            logger.warning("Qdrant is not connected")
+            return []
+        
+        queries = [damage_description] if isinstance(damage_description, str) else damage_description
+        if not queries:
             return []
         
         try:
-            results = self.qdrant_service.search(
-                query=damage_description,
+            batches = self.qdrant_service.search_batch(
+                queries=queries,
                 limit=top_k,
                 score_threshold=score_threshold,
+                payload_fields=RETRIEVAL_PAYLOAD_FIELDS,
             )
             
+            # A chunk matched by several queries keeps its best score
+            best: dict[str, dict] = {}
+            for results in batches:
+                for result in results:
+                    point_id = result.get('id')
+                    if point_id not in best or result.get('score', 0.0) > best[point_id].get('score', 0.0):
+                        best[point_id] = result
+            results = sorted(best.values(), key=lambda r: r.get('score', 0.0), reverse=True)[:top_k]
+            
             chunks = []
             for result in results:
                 payload = result.get('payload', {})
@@ -446,7 +900,7 @@ class RAGService:
             return chunks
             
         except Exception as e:
-            print(f"Error retrieving chunks: {e}")
+            logger.warning("Error retrieving chunks: %s", e)
             return []
     
     def generate_estimate(
@@ -473,19 +927,7 @@ class RAGService:
             GeneratedEstimate object
         """
         # Convert damages to dict format
-        damage_dicts = [d.model_dump() for d in damage_descriptions]
-        
-        # Convert chunks to dict format
-        chunk_dicts = [
-            {
-                'score': c.score,
-                'content': c.content,
-                'vehicle_info': c.vehicle_info,
-                'side': c.side,
-                'approved_estimate': c.approved_estimate,
-            }
-            for c in retrieved_chunks
-        ]
+        damage_dicts = DAMAGE_LIST_ADAPTER.dump_python(damage_descriptions)
         
         # Use custom prompt if provided, otherwise use default
         if custom_prompt:
@@ -500,7 +942,7 @@ class RAGService:
                 vehicle_info=format_vehicle_info(vehicle_info.model_dump() if vehicle_info else None),
                 damage_descriptions=format_damage_descriptions(damage_dicts),
                 human_description=human_description or "Not provided",
-                retrieved_chunks=format_retrieved_chunks(chunk_dicts),
+                retrieved_chunks=format_retrieved_chunks(retrieved_chunks),
                 pss_data=format_pss_data(pss_data),
             )
         else:
@@ -508,25 +950,30 @@ class RAGService:
                 vehicle_info=vehicle_info.model_dump() if vehicle_info else None,
                 damage_descriptions=damage_dicts,
                 human_description=human_description,
-                retrieved_chunks=chunk_dicts,
+                retrieved_chunks=retrieved_chunks,
                 pss_data=pss_data,
             )
         
         # Generate estimate
         message = HumanMessage(content=prompt)
-        print(f"DEBUG: Sending prompt to LLM (length: {len(prompt)} chars)")
+        logger.debug("Sending prompt to LLM (length: %d chars)", len(prompt))
         
         try:
             result: EstimateOutput = self.estimate_model.invoke([message])
-            print(f"DEBUG: LLM response estimate keys: {list(result.estimate.keys()) if result.estimate else 'empty'}")
-            print(f"DEBUG: Full LLM response: {result.estimate}")
+            logger.debug("LLM response estimate keys: %s", list(result.estimate) or "empty")
+            logger.debug("Full LLM response: %s", result.estimate)
         except Exception as e:
-            print(f"DEBUG: LLM invocation error: {e}")
+            logger.warning("LLM invocation error: %s", e)
             # Return empty estimate on error
             return GeneratedEstimate(estimate={})
         
+        if not result.estimate:
+            return GeneratedEstimate(estimate={})
+        
         # Extract PSS parts for matching
         pss_parts_map = self._extract_pss_parts(pss_data)
+        # Built on the first operation the LLM left without a PartId
+        pss_index = None
         
         # Convert to EstimateOperation objects and build the estimate dict
         from models.rag_models import EstimateOperation
@@ -536,24 +983,26 @@ class RAGService:
             estimate_dict[category] = []
             for op in operations:
                 # Only include LaborHours if Operation is "Repair"
-                labor_hours = op.get('LaborHours') if op.get('Operation') == 'Repair' else None
+                labor_hours = op.LaborHours if op.Operation == 'Repair' else None
                 
                 # Get PartId - use from LLM response if provided, otherwise match with PSS data
-                part_id = str(op.get('PartId','') or '')
-                part_description = op.get('Description', '')
+                part_id = str(op.PartId or '')
+                part_description = op.Description
                 
                 # If LLM didn't provide PartId, try to match with PSS data
                 if not part_id:
-                    part_id = self._match_part_with_pss(part_description, pss_parts_map)
+                    if pss_index is None and pss_parts_map:
+                        pss_index = self._index_pss_parts(pss_parts_map)
+                    part_id = self._match_part_with_pss(part_description, pss_parts_map, pss_index)
                     
                     # If no match found, try to match with the category name
                     if not part_id:
-                        part_id = self._match_part_with_pss(category, pss_parts_map)
+                        part_id = self._match_part_with_pss(category, pss_parts_map, pss_index)
                 
                 estimate_dict[category].append(
                     EstimateOperation(
-                        Description=op.get('Description', 'Unknown'),
-                        Operation=op.get('Operation', 'Unknown'),
+                        Description=op.Description,
+                        Operation=op.Operation,
                         LaborHours=labor_hours,
                         PartId=str(part_id or ''),
                     )
@@ -571,6 +1020,7 @@ class RAGService:
         Flow:
         1. Use provided damage descriptions directly
         2. Retrieve similar chunks from Qdrant using merged_damage_description
+           plus one query per damaged part
         3. Generate estimate using retrieved chunks + PSS data
         
         Args:
@@ -588,8 +1038,8 @@ class RAGService:
             # Use provided damage descriptions directly
             all_damages: list[DamageDescription] = request.damage_descriptions or []
             
-            print(f"DEBUG: Received {len(all_damages)} damage descriptions")
-            print(f"DEBUG: PSS data loaded: {pss_data is not None}")
+            logger.debug("Received %d damage descriptions", len(all_damages))
+            logger.debug("PSS data loaded: %s", pss_data is not None)
             
             # Build search query from merged_damage_description or individual descriptions
             search_query = request.merged_damage_description
@@ -597,7 +1047,7 @@ class RAGService:
                 # Create merged description from individual damages if not provided
                 search_query = self._merge_damage_descriptions(all_damages, request.vehicle_info)
             
-            print(f"DEBUG: Search query: {search_query}")
+            logger.debug("Search query: %s", search_query)
             
             if not search_query:
                 return RAGEstimateResponse(
@@ -606,12 +1056,27 @@ class RAGService:
                     processing_time_seconds=time.time() - start_time,
                 )
             
-            # Step 1: Retrieve similar chunks from Qdrant
+            # Nothing was damaged: skip retrieval and the estimate LLM call
+            if not all_damages and search_query.strip() == NO_DAMAGE_DESCRIPTION:
+                return RAGEstimateResponse(
+                    success=True,
+                    images_analyzed=len(request.images) if request.images else 0,
+                    images_with_damage=0,
+                    damage_detections=[],
+                    generated_estimate=GeneratedEstimate(estimate={}),
+                    vehicle_info=request.vehicle_info,
+                    human_damage_description=request.merged_damage_description,
+                    pss_data_used=pss_data is not None,
+                    processing_time_seconds=time.time() - start_time,
+                )
+            
+            # Step 1: Retrieve similar chunks from Qdrant, for the merged query
+            # and each damaged part in one batched search
             retrieved_chunks = self.retrieve_similar_chunks(
-                damage_description=search_query,
+                damage_description=[search_query, *self._part_queries(all_damages, request.vehicle_info)],
             )
             
-            print(f"DEBUG: Retrieved {len(retrieved_chunks)} chunks from Qdrant")
+            logger.debug("Retrieved %d chunks from Qdrant", len(retrieved_chunks))
             
             # Step 2: Generate estimate
             generated_estimate = self.generate_estimate(
@@ -623,7 +1088,7 @@ class RAGService:
                 custom_prompt=request.custom_estimate_prompt,
             )
             
-            print(f"DEBUG: Generated estimate with {len(generated_estimate.estimate)} categories")
+            logger.debug("Generated estimate with %d categories", len(generated_estimate.estimate))
             
             return RAGEstimateResponse(
                 success=True,
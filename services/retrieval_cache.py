@@ -0,0 +1,94 @@
+"""SQLite-backed cache for Qdrant search results."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import orjson
+
+
+class RetrievalCache:
+    """Qdrant search results keyed by query hash, expiring after a TTL.
+
+    Entries live in SQLite (the file when a path is given, otherwise an
+    in-memory database), so every worker process sharing the file sees the
+    same results and the same invalidations.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = 86400):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Location of the SQLite file, or None for a per-process cache.
+            ttl: Seconds a cached result stays valid.
+        """
+        self._lock = threading.Lock()
+        self._ttl = ttl
+
+        if path is not None:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared across the request threadpool; access is serialized by the lock
+        self._conn = sqlite3.connect(":memory:" if path is None else path, check_same_thread=False)
+        if path is not None:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS retrievals ("
+            "key BLOB PRIMARY KEY, collection TEXT NOT NULL, expires REAL NOT NULL, results BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS retrievals_collection ON retrievals (collection)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        collection: str,
+        query: str,
+        limit: int,
+        score_threshold: Optional[float],
+        payload_fields: Optional[list[str]],
+    ) -> bytes:
+        """Build the cache key for one search request."""
+        fields = ",".join(payload_fields) if payload_fields else "*"
+        return hashlib.sha256(
+            f"{collection}|{query}|{limit}|{score_threshold}|{fields}".encode()
+        ).digest()
+
+    def get(self, key: bytes) -> Optional[list[dict]]:
+        """Return the cached results for ``key``, or None on a miss or expiry."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results FROM retrievals WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchone()
+        return orjson.loads(row[0]) if row is not None else None
+
+    def set(self, key: bytes, collection: str, results: list[dict]) -> None:
+        """Store the results of one search."""
+        blob = orjson.dumps(results)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO retrievals (key, collection, expires, results) VALUES (?, ?, ?, ?)",
+                (key, collection, time.time() + self._ttl, blob),
+            )
+
+    def invalidate(self, collection: str) -> None:
+        """Drop every cached result for ``collection`` (and any expired entries)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM retrievals WHERE collection = ? OR expires <= ?", (collection, time.time())
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def get_retrieval_cache(path: Optional[Path] = None, ttl: float = 86400) -> RetrievalCache:
+    """Return the process-wide cache for ``path`` so every service shares one instance."""
+    return RetrievalCache(path, ttl)
@@ -1,23 +1,83 @@
 """Service for interacting with AWS S3 to read vehicle images."""
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import boto3
+import orjson
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Optional
+from typing import Iterator, Optional
 from urllib.parse import urlparse
 import io
 
 from config import settings
 
 
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'})
+# str.endswith takes a tuple, matching every extension in one C-level call
+IMAGE_SUFFIXES = tuple(IMAGE_EXTENSIONS)
+
+# Objects larger than one part are downloaded as parallel ranged GETs, since a
+# single S3 connection tops out well below what several can pull together
+RANGE_PART_SIZE = 8 * 1024 * 1024
+RANGE_MAX_WORKERS = 8
+
+# botocore defaults to 10 pooled connections, fewer than the parallel image
+# fetches and ranged GETs in flight across the services sharing the client
+S3_MAX_POOL_CONNECTIONS = 64
+
+
+def _content_range_total(content_range: Optional[str]) -> Optional[int]:
+    """Total object size from a Content-Range header such as 'bytes 0-99/1234'."""
+    if not content_range or '/' not in content_range:
+        return None
+    total = content_range.rsplit('/', 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+@lru_cache(maxsize=4)
+def get_s3_client(region: Optional[str]):
+    """Return the process-wide S3 client for ``region``; boto3 clients are thread-safe."""
+    return boto3.client(
+        's3',
+        region_name=region,
+        config=Config(
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            # Back off client-side when S3 answers 503 SlowDown
+            retries={'max_attempts': 5, 'mode': 'adaptive'},
+        ),
+    )
+
+
+# Each image URL is parsed again for every fetch of that image (classification,
+# damage analysis, retries), so the split is memoized
+@lru_cache(maxsize=4096)
+def _split_s3_url(s3_url: str) -> tuple[str, str]:
+    """Split an s3:// or virtual-hosted https S3 URL into (bucket, key)."""
+    if s3_url.startswith('s3://'):
+        # Format: s3://bucket/key; fixed layout, so plain slicing suffices
+        bucket, _, key = s3_url[5:].partition('/')
+        key = key.lstrip('/')
+    elif 's3.amazonaws.com' in s3_url or 's3.' in s3_url:
+        # Format: https://bucket.s3.region.amazonaws.com/key
+        parsed = urlparse(s3_url)
+        # Extract bucket from hostname
+        hostname_parts = parsed.netloc.split('.')
+        bucket = hostname_parts[0]
+        key = parsed.path.lstrip('/')
+    else:
+        raise ValueError(f"Invalid S3 URL format: {s3_url}")
+    return bucket, key
+
+
 class S3Service:
     """Service for reading images from AWS S3 buckets."""
     
     def __init__(self):
         """Initialize the S3 client with AWS credentials."""
-        self.client = boto3.client(
-            's3',
-            region_name=settings.aws_region,
-        )
+        self.client = get_s3_client(settings.aws_region)
         self.default_bucket = settings.aws_s3_bucket
     
     def parse_s3_url(self, s3_url: str, use_default_bucket: bool = True) -> tuple[str, str]:
@@ -31,20 +91,7 @@ class S3Service:
         Returns:
             Tuple of (bucket_name, key)
         """
-        if s3_url.startswith('s3://'):
-            # Format: s3://bucket/key
-            parsed = urlparse(s3_url)
-            bucket = parsed.netloc
-            key = parsed.path.lstrip('/')
-        elif 's3.amazonaws.com' in s3_url or 's3.' in s3_url:
-            # Format: https://bucket.s3.region.amazonaws.com/key
-            parsed = urlparse(s3_url)
-            # Extract bucket from hostname
-            hostname_parts = parsed.netloc.split('.')
-            bucket = hostname_parts[0]
-            key = parsed.path.lstrip('/')
-        else:
-            raise ValueError(f"Invalid S3 URL format: {s3_url}")
+        bucket, key = _split_s3_url(s3_url)
         
         # Use default bucket if configured and requested
         if use_default_bucket and self.default_bucket:
@@ -65,40 +112,112 @@ class S3Service:
         bucket, key = self.parse_s3_url(s3_url)
         
         try:
-            response = self.client.get_object(Bucket=bucket, Key=key)
+            # The first request doubles as the size probe: small images arrive
+            # whole, larger ones report their total size in Content-Range
+            try:
+                response = self.client.get_object(
+                    Bucket=bucket, Key=key, Range=f"bytes=0-{RANGE_PART_SIZE - 1}"
+                )
+            except ClientError as e:
+                # Empty objects cannot satisfy any range
+                if e.response.get('Error', {}).get('Code') != 'InvalidRange':
+                    raise
+                response = self.client.get_object(Bucket=bucket, Key=key)
             image_data = response['Body'].read()
+            total_size = _content_range_total(response.get('ContentRange'))
+            if total_size is not None and total_size > len(image_data):
+                try:
+                    image_data = self._get_remaining_ranges(
+                        bucket, key, image_data, total_size, response.get('ETag')
+                    )
+                except ClientError as e:
+                    if e.response.get('Error', {}).get('Code') != 'PreconditionFailed':
+                        raise
+                    # Overwritten mid-download; fetch the new version whole
+                    response = self.client.get_object(Bucket=bucket, Key=key)
+                    image_data = response['Body'].read()
             content_type = response.get('ContentType', 'image/jpeg')
             content_type = 'image/jpeg' if content_type =='application/octet-stream'  else content_type
             return image_data, content_type
         except ClientError as e:
             raise Exception(f"Failed to download image from S3: {e}")
     
-    def list_images_in_folder(self, bucket: str, prefix: str) -> list[str]:
+    def _get_remaining_ranges(
+        self,
+        bucket: str,
+        key: str,
+        first_part: bytes,
+        total_size: int,
+        etag: Optional[str],
+    ) -> bytes:
         """
-        List all image files in an S3 folder.
+        Fetch the rest of a large object as parallel ranged GETs and join the parts.
+        
+        Every range is conditioned on the first part's ETag, so an object
+        overwritten mid-download raises PreconditionFailed instead of being
+        spliced together from two versions.
+        """
+        ranges = [
+            f"bytes={start}-{min(start + RANGE_PART_SIZE, total_size) - 1}"
+            for start in range(len(first_part), total_size, RANGE_PART_SIZE)
+        ]
+        conditions = {'IfMatch': etag} if etag else {}
+        
+        def fetch(byte_range: str) -> bytes:
+            return self.client.get_object(
+                Bucket=bucket, Key=key, Range=byte_range, **conditions
+            )['Body'].read()
+        
+        with ThreadPoolExecutor(max_workers=min(RANGE_MAX_WORKERS, len(ranges))) as executor:
+            parts = list(executor.map(fetch, ranges))
+        return b"".join([first_part, *parts])
+    
+    def iter_images_in_folder(self, bucket: str, prefix: str) -> Iterator[str]:
+        """
+        Lazily yield image files in an S3 folder, one listing page at a time.
         
         Args:
             bucket: S3 bucket name
             prefix: Folder prefix (path)
         
-        Returns:
-            List of S3 URLs for images
+        Yields:
+            S3 URLs for images, as soon as their listing page arrives
         """
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
-        images = []
-        
         try:
             paginator = self.client.get_paginator('list_objects_v2')
             for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-                for obj in page.get('Contents', []):
+                for obj in page.get('Contents', ()):
                     key = obj['Key']
-                    ext = key.lower().split('.')[-1] if '.' in key else ''
-                    if f'.{ext}' in image_extensions:
-                        images.append(f"s3://{bucket}/{key}")
+                    if key.lower().endswith(IMAGE_SUFFIXES):
+                        yield f"s3://{bucket}/{key}"
         except ClientError as e:
             raise Exception(f"Failed to list images from S3: {e}")
+    
+    def iter_images_from_url(self, s3_folder_url: str) -> Iterator[str]:
+        """
+        Lazily yield image files from an S3 folder URL.
+        
+        Args:
+            s3_folder_url: S3 URL of the folder (e.g., s3://bucket/claims/id/images/)
+        
+        Yields:
+            S3 URLs for images
+        """
+        bucket, prefix = self.parse_s3_url(s3_folder_url)
+        return self.iter_images_in_folder(bucket, prefix)
+    
+    def list_images_in_folder(self, bucket: str, prefix: str) -> list[str]:
+        """
+        List all image files in an S3 folder.
+        
+        Args:
+            bucket: S3 bucket name
+            prefix: Folder prefix (path)
         
-        return images
+        Returns:
+            List of S3 URLs for images
+        """
+        return list(self.iter_images_in_folder(bucket, prefix))
     
     def list_images_from_url(self, s3_folder_url: str) -> list[str]:
         """
@@ -110,8 +229,7 @@ class S3Service:
         Returns:
             List of S3 URLs for images
         """
-        bucket, prefix = self.parse_s3_url(s3_folder_url)
-        return self.list_images_in_folder(bucket, prefix)
+        return list(self.iter_images_from_url(s3_folder_url))
     
     def get_json(self, s3_url: str) -> dict:
         """
@@ -123,17 +241,15 @@ class S3Service:
         Returns:
             Parsed JSON as a dictionary
         """
-        import json
-        
         bucket, key = self.parse_s3_url(s3_url)
         
         try:
             response = self.client.get_object(Bucket=bucket, Key=key)
-            json_data = response['Body'].read().decode('utf-8')
-            return json.loads(json_data)
+            # orjson parses the raw bytes directly, no decode step
+            return orjson.loads(response['Body'].read())
         except ClientError as e:
             raise Exception(f"Failed to download JSON from S3: {e}")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise Exception(f"Failed to parse JSON from S3: {e}")
     
     def is_configured(self) -> bool:
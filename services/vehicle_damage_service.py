@@ -1,19 +1,22 @@
 """Service for vehicle damage analysis using Gemini API and S3."""
 
 import base64
+import logging
 import time
 from typing import Optional, Literal
 from io import BytesIO
+from itertools import chain
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.messages import HumanMessage
 from pydantic import BaseModel, Field
-from PIL import Image
+from PIL import Image, ImageOps
 
 from config import settings
 from models.vehicle_damage import (
     VehicleSide,
+    VEHICLE_SIDE_LOOKUP,
     VehicleInfo,
     DamageDescription,
     ClassifyImagesResponse,
@@ -24,8 +27,10 @@ from models.vehicle_damage import (
 from prompts.vehicle_damage import (
     get_classification_prompt,
     get_damage_analysis_prompt,
+    get_classify_and_analyze_prompt,
     get_merge_damage_prompt,
 )
+from services.image_cache import ImageCache
 from services.s3_service import S3Service
 import os 
 
@@ -34,6 +39,8 @@ os.environ['LANGSMITH_ENDPOINT'] = 'https://api.smith.langchain.com'
 os.environ['LANGSMITH_API_KEY'] = settings.langsmith_api_key
 os.environ['LANGSMITH_PROJECT'] = settings.langsmith_project or 'default'
 
+logger = logging.getLogger(__name__)
+
 
 class ClassificationResult(BaseModel):
     """Structured output for image classification."""
@@ -65,6 +72,114 @@ class DamageAnalysisResult(BaseModel):
         description="List of damage descriptions"
     )
 
+class ImageClassification(ClassificationResult):
+    """Classification of one labelled image in a fused request."""
+    image_index: int = Field(description="Label number of the classified image")
+
+
+class SideDamageItem(DamageItem):
+    """Damage item tagged with the side of the vehicle it was found on."""
+    side: Literal["front", "rear", "left", "right", "roof"] = Field(
+        description="Side of the vehicle the damage is on"
+    )
+
+
+class ClassifyAndAnalyzeResult(BaseModel):
+    """Structured output for fused classification and damage analysis."""
+    classifications: list[ImageClassification] = Field(
+        description="One classification per image"
+    )
+    damage_descriptions: list[SideDamageItem] = Field(
+        description="List of damage descriptions across all images"
+    )
+
+
+# Claims with at most this many images are classified and analyzed in a
+# single Gemini call; larger ones use the per-image/per-side pipeline
+FUSED_ANALYSIS_MAX_IMAGES = 20
+
+# Order of the analyzed sides; fused results are grouped the same way as the
+# per-side pipeline returns them
+DAMAGE_SIDE_ORDER = {side: index for index, side in enumerate(("front", "rear", "left", "right", "roof"))}
+
+# Raw image bytes per damage analysis request. Base64 inflates this by 4/3,
+# which keeps the request under Gemini's 20 MB inline payload limit.
+MAX_INLINE_IMAGE_BYTES = 14 * 1024 * 1024
+
+
+def _batch_images_by_size(
+    images_data: list[tuple[bytes | str, str]],
+    max_bytes: int,
+) -> list[list[tuple[bytes | str, str]]]:
+    """Group consecutive images into batches whose raw size stays under max_bytes."""
+    batches: list[list[tuple[bytes | str, str]]] = []
+    batch: list[tuple[bytes | str, str]] = []
+    batch_bytes = 0
+    for image in images_data:
+        size = _raw_image_size(image[0])
+        if batch and batch_bytes + size > max_bytes:
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append(image)
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+# Number of downloaded, base64-encoded images kept per service instance so the
+# classification and damage analysis steps of a claim share one S3 fetch;
+# entries expire after settings.image_cache_ttl
+IMAGE_CACHE_SIZE = 64
+
+# Parallel S3 reads per claim; GET throughput stops improving past ~16
+IMAGE_FETCH_WORKERS = 16
+
+
+# Long edge sent to Gemini; larger photos are downscaled and re-encoded as JPEG
+# first, since the model works at this resolution anyway
+MAX_IMAGE_EDGE = 1536
+IMAGE_JPEG_QUALITY = 85
+
+
+def _downscale_image(image_data: bytes, mime_type: str) -> tuple[bytes, str]:
+    """Shrink an oversized image to MAX_IMAGE_EDGE; small or undecodable images pass through."""
+    try:
+        # Every intermediate image is closed on exit, releasing its decoded
+        # buffer right away instead of on a later GC pass; with many large
+        # photos decoded in parallel that keeps peak memory bounded
+        with Image.open(BytesIO(image_data)) as source:
+            width, height = source.size
+            scale = MAX_IMAGE_EDGE / max(width, height)
+            if scale >= 1:
+                return image_data, mime_type
+            # JPEGs can be decoded at a reduced scale, skipping most of the work
+            source.draft('RGB', (round(width * scale), round(height * scale)))
+            # Bake in the EXIF rotation, which is dropped when re-encoding
+            with ImageOps.exif_transpose(source) as image:
+                image.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.Resampling.LANCZOS)
+                with image.convert('RGB') as rgb, BytesIO() as output:
+                    rgb.save(output, 'JPEG', quality=IMAGE_JPEG_QUALITY, optimize=True)
+                    return output.getvalue(), 'image/jpeg'
+    except Exception as e:
+        logger.warning("Could not downscale image, sending original: %s", e)
+        return image_data, mime_type
+
+
+def _to_base64(image_data: bytes | str) -> str:
+    """Base64-encode raw image bytes; already-encoded (cached) images pass through."""
+    if isinstance(image_data, str):
+        return image_data
+    return base64.b64encode(image_data).decode('utf-8')
+
+
+def _raw_image_size(image_data: bytes | str) -> int:
+    """Decoded size of an image given as raw bytes or base64 text."""
+    if isinstance(image_data, str):
+        return len(image_data) * 3 // 4
+    return len(image_data)
+
+
 class VehicleDamageService:
     """Service for analyzing vehicle damage from S3 images using Gemini API."""
     
@@ -87,12 +202,36 @@ class VehicleDamageService:
             schema=DamageAnalysisResult,
             method="json_schema",
         )
+        self.classify_and_analyze_model = self.model.with_structured_output(
+            schema=ClassifyAndAnalyzeResult,
+            method="json_schema",
+        )
         self.s3_service = S3Service()
+        self._image_cache: ImageCache[tuple[str, str]] = ImageCache(IMAGE_CACHE_SIZE, settings.image_cache_ttl)
     
+    def get_image_base64(self, s3_url: str) -> tuple[str, str]:
+        """
+        Download an image from S3, downscale it and base64-encode it, reusing earlier fetches.
+        
+        Args:
+            s3_url: S3 URL of the image
+        
+        Returns:
+            Tuple of (base64 image data, mime_type)
+        """
+        cached = self._image_cache.get(s3_url)
+        if cached is not None:
+            return cached
+        
+        image_data, mime_type = _downscale_image(*self.s3_service.get_image(s3_url))
+        encoded = (base64.b64encode(image_data).decode('utf-8'), mime_type)
+        
+        self._image_cache.set(s3_url, encoded)
+        return encoded
     
     def classify_image(
         self,
-        image_data: bytes,
+        image_data: bytes | str,
         mime_type: str = "image/jpeg",
         custom_prompt: Optional[str] = None,
     ) -> tuple[VehicleSide, float]:
@@ -100,7 +239,7 @@ class VehicleDamageService:
         Classify a vehicle image to determine which side it shows.
         
         Args:
-            image_data: Raw image bytes
+            image_data: Raw image bytes, or base64 text from get_image_base64
             mime_type: MIME type of the image
             custom_prompt: Optional custom prompt for classification
         
@@ -108,7 +247,7 @@ class VehicleDamageService:
             Tuple of (VehicleSide, confidence)
         """
         prompt = custom_prompt if custom_prompt else get_classification_prompt()
-        image_base64 = base64.b64encode(image_data).decode('utf-8')
+        image_base64 = _to_base64(image_data)
         
         message = HumanMessage(
             content=[
@@ -122,14 +261,14 @@ class VehicleDamageService:
         )
         
         result: ClassificationResult = self.classification_model.invoke([message])
-        side = VehicleSide(result.side)
+        side = VehicleSide.normalize(result.side)
         confidence = result.confidence
         
         return side, confidence
     
     def analyze_damage(
         self,
-        images_data: list[tuple[bytes, str]],
+        images_data: list[tuple[bytes | str, str]],
         vehicle_info: VehicleInfo,
         side: VehicleSide,
         approved_estimate: dict,
@@ -139,7 +278,7 @@ class VehicleDamageService:
         Analyze damage from multiple images of the same vehicle side.
         
         Args:
-            images_data: List of (image_bytes, mime_type) tuples
+            images_data: List of (image_bytes or base64 text, mime_type) tuples
             vehicle_info: Vehicle information
             side: Side of the vehicle being analyzed
             approved_estimate: Approved estimate operations
@@ -171,21 +310,24 @@ class VehicleDamageService:
                 approved_estimate=approved_estimate,
             )
         
-        content_parts = [{"type": "text", "text": prompt}]
-        for image_data, mime_type in images_data:
-            image_base64 = base64.b64encode(image_data).decode('utf-8')
-            content_parts.append({
-                "type": "image",
-                "base64": image_base64,
-                "mime_type": mime_type,
-            })
-        
-        message = HumanMessage(content=content_parts)
-        
-        result: DamageAnalysisResult = self.damage_analysis_model.invoke([message])
+        # All images of the side go out in one multi-image request; only a side
+        # whose images would overflow Gemini's inline payload limit is split
         damage_descriptions = []
-        for damage_item in result.damage_descriptions:
-            damage_descriptions.append(DamageDescription(**damage_item.model_dump()))
+        for batch in _batch_images_by_size(images_data, MAX_INLINE_IMAGE_BYTES):
+            message = HumanMessage(content=[
+                {"type": "text", "text": prompt},
+                *(
+                    {"type": "image", "base64": _to_base64(image_data), "mime_type": mime_type}
+                    for image_data, mime_type in batch
+                ),
+            ])
+            
+            result: DamageAnalysisResult = self.damage_analysis_model.invoke([message])
+            # Models built by this service are assembled from already-validated
+            # objects (structured-output results, request models), so they use
+            # model_construct to skip re-validation. Untrusted input must not.
+            for damage_item in result.damage_descriptions:
+                damage_descriptions.append(DamageDescription.model_construct(**damage_item.model_dump()))
         
         return damage_descriptions
     
@@ -255,7 +397,7 @@ class VehicleDamageService:
             all_image_urls = self.s3_service.list_images_from_url(bucket_url)
             
             if not all_image_urls:
-                return VehicleDamageAnalysisResponse(
+                return VehicleDamageAnalysisResponse.model_construct(
                     success=False,
                     vehicle_info=vehicle_info,
                     classified_images={},
@@ -274,7 +416,17 @@ class VehicleDamageService:
                 "roof": [],
                 "unknown": [],
             }
-            image_data_by_side: dict[str, list[tuple[bytes, str]]] = {
+            
+            if len(all_image_urls) <= FUSED_ANALYSIS_MAX_IMAGES:
+                fused_damages = self._classify_and_analyze(
+                    all_image_urls, vehicle_info, approved_estimate or {}, classified_images
+                )
+                if fused_damages is not None:
+                    return self._analysis_response(
+                        vehicle_info, classified_images, fused_damages, approved_estimate, start_time
+                    )
+            
+            image_data_by_side: dict[str, list[tuple[str, str]]] = {
                 "front": [],
                 "rear": [],
                 "left": [],
@@ -282,50 +434,48 @@ class VehicleDamageService:
                 "roof": [],
             }
             
-            for s3_url in all_image_urls:
-                try:
-                    image_data, mime_type = self.s3_service.get_image(s3_url)
-                    side, confidence = self.classify_image(image_data, mime_type)
+            # Download and classify concurrently; map() keeps the listing order
+            # so each side's images reach the damage prompt in a stable order
+            with ThreadPoolExecutor(max_workers=IMAGE_FETCH_WORKERS) as executor:
+                for s3_url, image, side in executor.map(self._fetch_and_classify, all_image_urls):
+                    side_images = image_data_by_side.get(side.value)
+                    # Views without a bucket here (interior, engine, ...) count as unknown
+                    if image is None or side_images is None:
+                        classified_images["unknown"].append(s3_url)
+                        continue
                     classified_images[side.value].append(s3_url)
-                    
-                    if side != VehicleSide.UNKNOWN:
-                        image_data_by_side[side.value].append((image_data, mime_type))
-                except Exception as e:
-                    print(f"Error processing image {s3_url}: {e}")
-                    classified_images["unknown"].append(s3_url)
+                    side_images.append(image)
             
             all_damage_descriptions: list[DamageDescription] = []
+            tasks = [
+                (VEHICLE_SIDE_LOOKUP[side_str], images_data)
+                for side_str, images_data in image_data_by_side.items()
+                if images_data
+            ]
             
-            for side_str, images_data in image_data_by_side.items():
-                if images_data:
-                    side = VehicleSide(side_str)
-                    damages = self.analyze_damage(
-                        images_data=images_data,
-                        vehicle_info=vehicle_info,
-                        side=side,
-                        approved_estimate=approved_estimate or {},
-                    )
-                    all_damage_descriptions.extend(damages)
-            
-            merged_description = self.merge_damage_descriptions(
-                vehicle_info=vehicle_info,
-                damage_descriptions=all_damage_descriptions,
-            )
-            
-            processing_time = time.time() - start_time
+            # Sides are independent Gemini calls; results are collected in
+            # side order so the merged description does not depend on timing
+            if tasks:
+                with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+                    futures = [
+                        executor.submit(
+                            self.analyze_damage,
+                            images_data=images_data,
+                            vehicle_info=vehicle_info,
+                            side=side,
+                            approved_estimate=approved_estimate or {},
+                        )
+                        for side, images_data in tasks
+                    ]
+                    for future in futures:
+                        all_damage_descriptions.extend(future.result())
             
-            return VehicleDamageAnalysisResponse(
-                success=True,
-                vehicle_info=vehicle_info,
-                classified_images=classified_images,
-                damage_descriptions=all_damage_descriptions,
-                merged_damage_description=merged_description,
-                approved_estimate=approved_estimate or {},
-                processing_time_seconds=processing_time,
+            return self._analysis_response(
+                vehicle_info, classified_images, all_damage_descriptions, approved_estimate, start_time
             )
             
         except Exception as e:
-            return VehicleDamageAnalysisResponse(
+            return VehicleDamageAnalysisResponse.model_construct(
                 success=False,
                 vehicle_info=vehicle_info,
                 classified_images={},
@@ -336,6 +486,136 @@ class VehicleDamageService:
                 error=str(e),
             )
     
+    def _analysis_response(
+        self,
+        vehicle_info: VehicleInfo,
+        classified_images: dict[str, list[str]],
+        damage_descriptions: list[DamageDescription],
+        approved_estimate: Optional[dict],
+        start_time: float,
+    ) -> VehicleDamageAnalysisResponse:
+        """Merge the damage descriptions and build the successful analysis response."""
+        merged_description = self.merge_damage_descriptions(
+            vehicle_info=vehicle_info,
+            damage_descriptions=damage_descriptions,
+        )
+        
+        processing_time = time.time() - start_time
+        
+        return VehicleDamageAnalysisResponse.model_construct(
+            success=True,
+            vehicle_info=vehicle_info,
+            classified_images=classified_images,
+            damage_descriptions=damage_descriptions,
+            merged_damage_description=merged_description,
+            approved_estimate=approved_estimate or {},
+            processing_time_seconds=processing_time,
+        )
+    
+    def _classify_and_analyze(
+        self,
+        image_urls: list[str],
+        vehicle_info: VehicleInfo,
+        approved_estimate: dict,
+        classified_images: dict[str, list[str]],
+    ) -> Optional[list[DamageDescription]]:
+        """
+        Classify and analyze a small claim's images in one Gemini call.
+        
+        Args:
+            image_urls: S3 URLs of all images in the claim
+            vehicle_info: Vehicle information
+            approved_estimate: Approved estimate operations
+            classified_images: Side buckets, filled in with the image URLs
+        
+        Returns:
+            Damage descriptions grouped by side, or None (with classified_images
+            untouched) when the images do not fit one request or the call fails
+        """
+        with ThreadPoolExecutor(max_workers=min(IMAGE_FETCH_WORKERS, len(image_urls))) as executor:
+            images = list(executor.map(self._download_image, image_urls))
+        
+        labelled = [(s3_url, image) for s3_url, image in zip(image_urls, images) if image is not None]
+        if not labelled or sum(_raw_image_size(image[0]) for _, image in labelled) > MAX_INLINE_IMAGE_BYTES:
+            return None
+        
+        prompt = get_classify_and_analyze_prompt(
+            year=vehicle_info.year,
+            make=vehicle_info.make,
+            model=vehicle_info.model,
+            body_type=vehicle_info.body_type,
+            image_count=len(labelled),
+            approved_estimate=approved_estimate,
+        )
+        content_parts = [{"type": "text", "text": prompt}]
+        for index, (_, (image_data, mime_type)) in enumerate(labelled):
+            content_parts.append({"type": "text", "text": f"Image {index}:"})
+            content_parts.append(
+                {"type": "image", "base64": _to_base64(image_data), "mime_type": mime_type}
+            )
+        
+        try:
+            result: ClassifyAndAnalyzeResult = self.classify_and_analyze_model.invoke(
+                [HumanMessage(content=content_parts)]
+            )
+        except Exception as e:
+            logger.warning("Fused classification and analysis failed, falling back to per-side analysis: %s", e)
+            return None
+        
+        sides: dict[int, VehicleSide] = {}
+        for classification in result.classifications:
+            sides.setdefault(classification.image_index, VehicleSide.normalize(classification.side))
+        
+        # Buckets keep the listing order; failed downloads and unlabelled or
+        # unbucketed views (interior, engine, ...) count as unknown
+        labels = {s3_url: index for index, (s3_url, _) in enumerate(labelled)}
+        for s3_url in image_urls:
+            side = sides.get(labels.get(s3_url, -1), VehicleSide.UNKNOWN)
+            classified_images.get(side.value, classified_images["unknown"]).append(s3_url)
+        
+        damage_items = sorted(result.damage_descriptions, key=lambda item: DAMAGE_SIDE_ORDER[item.side])
+        return [
+            DamageDescription.model_construct(**damage_item.model_dump(exclude={"side"}))
+            for damage_item in damage_items
+        ]
+    
+    def _fetch_and_classify(
+        self,
+        s3_url: str,
+    ) -> tuple[str, Optional[tuple[str, str]], VehicleSide]:
+        """
+        Download and classify a single image. Helper for parallel processing.
+        
+        Args:
+            s3_url: S3 URL of the image
+        
+        Returns:
+            Tuple of (s3_url, (base64 image data, mime_type) or None on failure, VehicleSide)
+        """
+        try:
+            image_data, mime_type = self.get_image_base64(s3_url)
+            side, confidence = self.classify_image(image_data, mime_type)
+            return s3_url, (image_data, mime_type), side
+        except Exception as e:
+            logger.warning("Error processing image %s: %s", s3_url, e)
+            return s3_url, None, VehicleSide.UNKNOWN
+    
+    def _download_image(self, s3_url: str) -> Optional[tuple[str, str]]:
+        """
+        Download a single image, returning None on failure. Helper for parallel processing.
+        
+        Args:
+            s3_url: S3 URL of the image
+        
+        Returns:
+            Tuple of (base64 image data, mime_type), or None if the download failed
+        """
+        try:
+            return self.get_image_base64(s3_url)
+        except Exception as e:
+            logger.warning("Error downloading image %s: %s", s3_url, e)
+            return None
+    
     def _classify_single_image(
         self,
         s3_url: str,
@@ -352,11 +632,11 @@ class VehicleDamageService:
             Tuple of (s3_url, VehicleSide)
         """
         try:
-            image_data, mime_type = self.s3_service.get_image(s3_url)
-            side, confidence = self.classify_image(image_data, mime_type, custom_prompt)
+            image_base64, mime_type = self.get_image_base64(s3_url)
+            side, confidence = self.classify_image(image_base64, mime_type, custom_prompt)
             return s3_url, side
         except Exception as e:
-            print(f"Error processing image {s3_url}: {e}")
+            logger.warning("Error processing image %s: %s", s3_url, e)
             return s3_url, VehicleSide.UNKNOWN
     
     def classify_images_only(
@@ -383,21 +663,14 @@ class VehicleDamageService:
         
         try:
             if image_urls:
-                all_image_urls = image_urls
+                image_url_stream = iter(image_urls)
             elif bucket_url:
-                all_image_urls = self.s3_service.list_images_from_url(bucket_url)
+                # Listing is consumed lazily so classification of the first
+                # page overlaps with pagination of the rest of the folder.
+                image_url_stream = self.s3_service.iter_images_from_url(bucket_url)
             else:
                 raise ValueError("Either bucket_url or image_urls must be provided")
             
-            if not all_image_urls:
-                return ClassifyImagesResponse(
-                    success=False,
-                    classified_images={},
-                    total_images=0,
-                    processing_time_seconds=time.time() - start_time,
-                    error="No images found in the specified location",
-                )
-            
             classified_images: dict[str, list[str]] = {
                 "front": [],
                 "rear": [],
@@ -407,11 +680,11 @@ class VehicleDamageService:
                 "unknown": [],
             }
             
-            # Process images in parallel
+            # Process images in parallel, submitting as URLs are listed
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 futures = {
                     executor.submit(self._classify_single_image, s3_url, custom_classification_prompt): s3_url
-                    for s3_url in all_image_urls
+                    for s3_url in image_url_stream
                 }
                 
                 for future in as_completed(futures):
@@ -420,18 +693,27 @@ class VehicleDamageService:
                         classified_images[side.value].append(s3_url)
                     except Exception as e:
                         s3_url = futures[future]
-                        print(f"Error processing image {s3_url}: {e}")
+                        logger.warning("Error processing image %s: %s", s3_url, e)
                         classified_images["unknown"].append(s3_url)
             
-            return ClassifyImagesResponse(
+            if not futures:
+                return ClassifyImagesResponse.model_construct(
+                    success=False,
+                    classified_images={},
+                    total_images=0,
+                    processing_time_seconds=time.time() - start_time,
+                    error="No images found in the specified location",
+                )
+            
+            return ClassifyImagesResponse.model_construct(
                 success=True,
                 classified_images=classified_images,
-                total_images=len(all_image_urls),
+                total_images=len(futures),
                 processing_time_seconds=time.time() - start_time,
             )
             
         except Exception as e:
-            return ClassifyImagesResponse(
+            return ClassifyImagesResponse.model_construct(
                 success=False,
                 classified_images={},
                 total_images=0,
@@ -468,19 +750,19 @@ class VehicleDamageService:
         Returns:
             ChunkOutput with damage descriptions from Gemini
         """
-        # Download images
-        images_data: list[tuple[bytes, str]] = []
-        for s3_url in images:
-            try:
-                image_data, mime_type = self.s3_service.get_image(s3_url)
-                images_data.append((image_data, mime_type))
-            except Exception as e:
-                print(f"Error downloading image {s3_url}: {e}")
+        # Download images in parallel (already-classified images come from the cache)
+        images_data: list[tuple[str, str]] = []
+        if images:
+            with ThreadPoolExecutor(max_workers=min(IMAGE_FETCH_WORKERS, len(images))) as executor:
+                images_data = [
+                    image for image in executor.map(self._download_image, images)
+                    if image is not None
+                ]
         
         # Analyze damage
         damage_descriptions: list[DamageDescription] = []
         if images_data:
-            vehicle_side = VehicleSide(side.lower())
+            vehicle_side = VehicleSide.normalize(side)
             damage_descriptions = self.analyze_damage(
                 images_data=images_data,
                 vehicle_info=vehicle_info,
@@ -496,7 +778,7 @@ class VehicleDamageService:
             custom_prompt=custom_merge_damage_prompt,
         )
         
-        return ChunkOutput(
+        return ChunkOutput.model_construct(
             vehicle_info=vehicle_info,
             side=side.capitalize(),
             images=images,
@@ -523,11 +805,9 @@ class VehicleDamageService:
         Returns:
             ChunkOutput matching the expected format
         """
-        all_images = []
-        for side, urls in response.classified_images.items():
-            all_images.extend(urls)
+        all_images = list(chain.from_iterable(response.classified_images.values()))
         
-        return ChunkOutput(
+        return ChunkOutput.model_construct(
             vehicle_info=response.vehicle_info,
             side=primary_side,
             images=all_images,
@@ -1,14 +1,50 @@
 """Script to upload claim images and PSS data to S3."""
 
 import boto3
+import orjson
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from config import settings
-from extractpss_new import extract_required_pss_data
+from extractpss_new import dump_required_pss_data
 
 
-def upload_file_to_s3(local_file_path: str, s3_key: str, bucket_name: str = None, content_type: str = None):
+# Images are already uploaded 16 at a time, so only the rare multipart upload
+# gets a few threads of its own; 1 MiB reads keep the file I/O cheap
+IMAGE_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=4,
+    io_chunksize=1024 * 1024,
+)
+
+# Files below this go up in a single put_object call, skipping the transfer
+# manager's setup; only larger ones use upload_file
+SINGLE_PUT_MAX_BYTES = 5 * 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def _get_s3_client():
+    """Return the shared S3 client; boto3 clients are thread-safe and costly to build."""
+    return boto3.client(
+        's3',
+        region_name=settings.aws_region,
+        # Room for upload_folder_images' concurrent uploads and their multipart threads
+        config=Config(max_pool_connections=50),
+    )
+
+
+def upload_file_to_s3(
+    local_file_path: str,
+    s3_key: str,
+    bucket_name: str = None,
+    content_type: str = None,
+    config: TransferConfig = IMAGE_TRANSFER_CONFIG,
+):
     """
     Upload a file to S3.
     
@@ -17,20 +53,28 @@ def upload_file_to_s3(local_file_path: str, s3_key: str, bucket_name: str = None
         s3_key: The S3 key (path) where the file will be stored
         bucket_name: S3 bucket name (defaults to settings.aws_s3_bucket)
         content_type: Content type for the file
+        config: Transfer settings (defaults to IMAGE_TRANSFER_CONFIG)
     """
     bucket_name = bucket_name or settings.aws_s3_bucket
     
-    s3 = boto3.client(
-        's3',
-        region_name=settings.aws_region,
-    )
+    s3 = _get_s3_client()
     
     try:
         extra_args = {}
         if content_type:
             extra_args['ContentType'] = content_type
         
-        s3.upload_file(local_file_path, bucket_name, s3_key, ExtraArgs=extra_args if extra_args else None)
+        if os.path.getsize(local_file_path) < SINGLE_PUT_MAX_BYTES:
+            with open(local_file_path, 'rb') as f:
+                s3.put_object(Bucket=bucket_name, Key=s3_key, Body=f.read(), **extra_args)
+        else:
+            s3.upload_file(
+                local_file_path,
+                bucket_name,
+                s3_key,
+                ExtraArgs=extra_args if extra_args else None,
+                Config=config,
+            )
         print(f"✓ Uploaded: {local_file_path} -> s3://{bucket_name}/{s3_key}")
         return f"s3://{bucket_name}/{s3_key}"
         
@@ -42,14 +86,15 @@ def upload_file_to_s3(local_file_path: str, s3_key: str, bucket_name: str = None
         return None
 
 
-def upload_folder_images(local_folder: str, s3_prefix: str, bucket_name: str = None):
+def upload_folder_images(local_folder: str, s3_prefix: str, bucket_name: str = None, max_workers: int = 16):
     """
-    Upload all images from a local folder to S3.
+    Upload all images from a local folder to S3 in parallel.
     
     Args:
         local_folder: Path to the local folder containing images
         s3_prefix: S3 prefix (folder path) where images will be stored
         bucket_name: S3 bucket name
+        max_workers: Maximum number of concurrent uploads (default: 16)
     
     Returns:
         List of uploaded S3 URLs
@@ -64,18 +109,25 @@ def upload_folder_images(local_folder: str, s3_prefix: str, bucket_name: str = N
         '.bmp': 'image/bmp',
     }
     
-    uploaded_urls = []
-    
+    jobs = []
     for filename in os.listdir(local_folder):
         ext = os.path.splitext(filename)[1].lower()
         if ext in image_extensions:
             local_path = os.path.join(local_folder, filename)
             s3_key = f"{s3_prefix}/{filename}"
             content_type = content_types.get(ext, 'application/octet-stream')
-            
-            url = upload_file_to_s3(local_path, s3_key, bucket_name, content_type)
-            if url:
-                uploaded_urls.append(url)
+            jobs.append((local_path, s3_key, content_type))
+    
+    if not jobs:
+        return []
+    
+    # Each PUT is latency-bound, so keep several in flight on the shared client
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        futures = [
+            executor.submit(upload_file_to_s3, local_path, s3_key, bucket_name, content_type)
+            for local_path, s3_key, content_type in jobs
+        ]
+        uploaded_urls = [url for url in (future.result() for future in futures) if url]
     
     return uploaded_urls
 
@@ -97,25 +149,29 @@ def process_and_upload_pss(pss_file_path: str, s3_key: str, bucket_name: str = N
     print(f"\nProcessing PSS file: {pss_file_path}")
     
     # Load and process PSS data
-    with open(pss_file_path, 'r') as f:
-        full_pss_data = json.load(f)
-    
-    optimized_pss = extract_required_pss_data(full_pss_data)
-    
-    # Save temporarily
-    temp_file = "temp_optimized_pss.json"
-    with open(temp_file, 'w') as f:
-        json.dump(optimized_pss, f, indent=2)
-    
-    print(f"✓ PSS optimized: {len(json.dumps(optimized_pss))} bytes")
-    
-    # Upload to S3
-    url = upload_file_to_s3(temp_file, s3_key, bucket_name, 'application/json')
+    with open(pss_file_path, 'rb') as f:
+        full_pss_data = orjson.loads(f.read())
     
-    # Clean up temp file
-    os.remove(temp_file)
+    # Optimize and serialize in one pass, without building the optimized
+    # dict, then upload straight from memory, no temp file
+    buffer = BytesIO()
+    dump_required_pss_data(full_pss_data, buffer)
+    body = buffer.getvalue()
+    print(f"✓ PSS optimized: {len(body)} bytes")
     
-    return url
+    try:
+        _get_s3_client().put_object(
+            Bucket=bucket_name,
+            Key=s3_key,
+            Body=body,
+            ContentType='application/json',
+        )
+        print(f"✓ Uploaded: {pss_file_path} -> s3://{bucket_name}/{s3_key}")
+        return f"s3://{bucket_name}/{s3_key}"
+        
+    except ClientError as e:
+        print(f"✗ Error uploading {pss_file_path}: {e}")
+        return None
 
 
 if __name__ == "__main__":
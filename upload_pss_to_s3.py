@@ -1,10 +1,29 @@
 """Script to upload PSS (Parts and Service Standards) JSON file to S3."""
 
 import boto3
+import os
+from functools import lru_cache
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from config import settings
 
 
+# PSS files fit in a single PUT; skip the transfer manager's thread pool
+JSON_TRANSFER_CONFIG = TransferConfig(multipart_threshold=64 * 1024 * 1024, use_threads=False)
+
+# Typical optimized PSS files are read into memory and sent with put_object
+SINGLE_PUT_MAX_BYTES = 5 * 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def _get_s3_client():
+    """Return the S3 client, created once per process."""
+    return boto3.client(
+        's3',
+        region_name=settings.aws_region,
+    )
+
+
 def upload_file_to_s3(local_file_path: str, s3_key: str, bucket_name: str = None):
     """
     Upload a file to S3.
@@ -16,20 +35,27 @@ def upload_file_to_s3(local_file_path: str, s3_key: str, bucket_name: str = None
     """
     bucket_name = bucket_name or settings.aws_s3_bucket
     
-    s3 = boto3.client(
-        's3',
-        region_name=settings.aws_region,
-    )
+    s3 = _get_s3_client()
     
     try:
         print(f"Uploading {local_file_path} to s3://{bucket_name}/{s3_key}...")
         
-        s3.upload_file(
-            local_file_path,
-            bucket_name,
-            s3_key,
-            ExtraArgs={'ContentType': 'application/json'}
-        )
+        if os.path.getsize(local_file_path) < SINGLE_PUT_MAX_BYTES:
+            with open(local_file_path, 'rb') as f:
+                s3.put_object(
+                    Bucket=bucket_name,
+                    Key=s3_key,
+                    Body=f.read(),
+                    ContentType='application/json',
+                )
+        else:
+            s3.upload_file(
+                local_file_path,
+                bucket_name,
+                s3_key,
+                ExtraArgs={'ContentType': 'application/json'},
+                Config=JSON_TRANSFER_CONFIG,
+            )
         
         print(f"✓ Successfully uploaded to s3://{bucket_name}/{s3_key}")
         return f"s3://{bucket_name}/{s3_key}"